@@ -0,0 +1,282 @@
+'''
+Columnar CSV loader with a binary snapshot cache
+
+First load parses the csv as text and writes a snapshot beside it :
+    matches.csv  ->  matches.csv.cache/meta.json + one raw .bin file per column
+
+Int columns are stored as int64, string columns as int32 dictionary codes
+(the distinct strings go in meta.json). Next loads mmap the .bin files directly,
+no text parsing at all, until the csv mtime / size (or content hash) changes.
+'''
+
+import csv
+import hashlib
+import json
+import mmap
+import os
+import sys
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+SNAPSHOT_VERSION = 1
+CODE_TYPE = 'i'  # string column codes
+INT_TYPE = 'q'  # int columns
+
+
+class StringColumn:
+    """Dictionary encoded string column"""
+    def __init__(self, codes=None, values=None):
+        self.codes = array(CODE_TYPE) if codes is None else codes  # one code per row
+        self.values = [] if values is None else values  # code -> string
+        self.lookup = {value: code for code, value in enumerate(self.values)}  # string -> code
+
+    def append(self, value: str):
+        code = self.lookup.get(value)
+        if code is None:
+            code = len(self.values)
+            self.lookup[value] = code
+            self.values.append(value)
+        self.codes.append(code)
+
+    def __getitem__(self, row: int) -> str:
+        return self.values[self.codes[row]]
+
+    def __len__(self):
+        return len(self.codes)
+
+
+class ColumnarTable:
+    """Columns of a csv file : int columns are int sequences, others are StringColumn"""
+    def __init__(self, header: List[str], columns: Dict[str, object], rows: int):
+        self.header = header
+        self.columns = columns
+        self.rows = rows
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __len__(self):
+        return self.rows
+
+
+def _is_int(value: str) -> bool:
+    return value == '' or value.lstrip('-').isdigit()
+
+
+def parse_csv(path: str, int_columns: Optional[Iterable[str]] = None) -> ColumnarTable:
+    """
+    Parse a csv into columns.
+
+    Args:
+        path: csv file.
+        int_columns: columns to store as int (empty cell -> 0). When None, a column is an
+            int column if all its values look like ints.
+
+    Blank lines are skipped, short rows are padded with empty cells, a row with more cells
+    than the header raises ValueError.
+    """
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        encoded = [StringColumn() for _ in header]
+        appends = [column.append for column in encoded]
+        width = len(header)
+        rows = 0
+        for row in reader:
+            if not row:  # blank line, skipped like pd.read_csv does
+                continue
+            if len(row) != width:
+                if len(row) > width:
+                    raise ValueError(f"{path} line {reader.line_num}: {len(row)} fields, the header has {width}")
+                row += [''] * (width - len(row))  # short row : missing trailing cells are empty
+            for append, value in zip(appends, row):
+                append(value)
+            rows += 1
+
+    if int_columns is None:
+        int_columns = [name for name, column in zip(header, encoded) if all(map(_is_int, column.values))]
+    int_columns = set(int_columns)
+
+    columns = {}
+    for name, column in zip(header, encoded):
+        if name in int_columns:
+            # decode every distinct value once, then map the codes
+            decoded = [int(value) if value else 0 for value in column.values]
+            columns[name] = array(INT_TYPE, [decoded[code] for code in column.codes])
+        else:
+            columns[name] = column
+    return ColumnarTable(header, columns, rows)
+
+
+def snapshot_dir(path: str) -> str:
+    return path + '.cache'
+
+
+def file_hash(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _source_info(path: str) -> Dict[str, int]:
+    st = os.stat(path)
+    return {'mtime_ns': st.st_mtime_ns, 'size': st.st_size}
+
+
+def write_snapshot(path: str, table: ColumnarTable, source: Dict[str, int], sha1: Optional[str] = None):
+    """
+    Write the binary snapshot of a parsed table beside the csv.
+
+    Args:
+        path: csv file.
+        table: parse_csv(path).
+        source: _source_info(path) taken BEFORE the parse : a csv appended to while it was parsed
+            then no longer matches the stamp, and the next load parses it again.
+        sha1: file_hash(path) taken before the parse, None when hashes are not checked
+            (such a snapshot is stale for verify_hash=True).
+    """
+    folder = snapshot_dir(path)
+    os.makedirs(folder, exist_ok=True)
+    meta_path = os.path.join(folder, 'meta.json')
+    # meta.json is written last, so a half written snapshot is never valid
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+    meta = {
+        'version': SNAPSHOT_VERSION,
+        'byteorder': sys.byteorder,
+        'source': source,
+        'sha1': sha1,
+        'header': table.header,
+        'rows': table.rows,
+        'int_columns': [],
+        'dictionaries': {},
+    }
+    for i, name in enumerate(table.header):
+        column = table.columns[name]
+        if isinstance(column, StringColumn):
+            data, typecode = column.codes, CODE_TYPE
+            meta['dictionaries'][name] = column.values
+        else:
+            data, typecode = column, INT_TYPE
+            meta['int_columns'].append(name)
+        if not isinstance(data, array):
+            data = array(typecode, data)
+        # written aside and swapped in : a column mapped by an earlier read_snapshot keeps its
+        # old inode, truncating the file in place would SIGBUS that reader
+        bin_path = os.path.join(folder, f'{i}.bin')
+        with open(bin_path + '.tmp', 'wb') as f:
+            data.tofile(f)
+        os.replace(bin_path + '.tmp', bin_path)
+
+    tmp_path = meta_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+
+
+def _map_column(file_path: str, typecode: str):
+    """mmap a raw column file as a read-only typed memoryview"""
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return array(typecode)
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(mm).cast(typecode)
+
+
+def read_snapshot(path: str, int_columns: Optional[Iterable[str]] = None, verify_hash=False) -> Optional[ColumnarTable]:
+    """Load the snapshot of a csv, or None when it is missing, stale or typed differently"""
+    folder = snapshot_dir(path)
+    try:
+        with open(os.path.join(folder, 'meta.json')) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if meta.get('version') != SNAPSHOT_VERSION or meta.get('byteorder') != sys.byteorder:
+        return None
+    if verify_hash:
+        if meta['sha1'] is None or meta['sha1'] != file_hash(path):
+            return None
+    elif meta['source'] != _source_info(path):
+        return None
+    if int_columns is not None and set(int_columns) != set(meta['int_columns']):
+        return None
+
+    columns = {}
+    for i, name in enumerate(meta['header']):
+        file_path = os.path.join(folder, f'{i}.bin')
+        typecode = CODE_TYPE if name in meta['dictionaries'] else INT_TYPE
+        try:
+            size = os.path.getsize(file_path)
+        except OSError:
+            return None
+        if size != meta['rows'] * array(typecode).itemsize:  # missing or truncated column
+            return None
+        if name in meta['dictionaries']:
+            columns[name] = StringColumn(_map_column(file_path, CODE_TYPE), meta['dictionaries'][name])
+        else:
+            columns[name] = _map_column(file_path, INT_TYPE)
+    return ColumnarTable(meta['header'], columns, meta['rows'])
+
+
+def load_columns(path: str, int_columns: Optional[Iterable[str]] = None, use_cache=True, verify_hash=False) -> ColumnarTable:
+    """
+    Load a csv as columns, through the binary snapshot when it is up to date.
+
+    Args:
+        path: csv file.
+        int_columns: see parse_csv.
+        use_cache: read / write the snapshot beside the csv.
+        verify_hash: validate the snapshot with the csv content hash instead of mtime and size.
+    """
+    if use_cache:
+        table = read_snapshot(path, int_columns, verify_hash)
+        if table is not None:
+            return table
+    # stamped before reading, so rows appended during the parse are never covered by the stamp
+    source = _source_info(path) if use_cache else None
+    sha1 = file_hash(path) if use_cache and verify_hash else None
+    table = parse_csv(path, int_columns)
+    if use_cache:
+        try:
+            write_snapshot(path, table, source, sha1)
+        except OSError as e:
+            print(f"Could not write snapshot for {path}: {e}")
+    return table
+
+
+def benchmark(path='matches.csv', repeat=20):
+    """Cold (parse + write snapshot) and warm (mmap) load times against a text parse"""
+    def timed(fn):
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    def cold():
+        meta_path = os.path.join(snapshot_dir(path), 'meta.json')
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        load_columns(path)
+
+    try:
+        import pandas as pd
+        print(f"pd.read_csv: {timed(lambda: pd.read_csv(path)):.4f} seconds")
+    except ImportError:
+        print("pandas not installed, skipping pd.read_csv")
+    print(f"text parse: {timed(lambda: parse_csv(path)):.4f} seconds")
+    print(f"cold load: {timed(cold):.4f} seconds")
+    print(f"warm load: {timed(lambda: load_columns(path)):.4f} seconds")
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    for csv_path in args or ['matches.csv']:
+        print(csv_path)
+        benchmark(csv_path)
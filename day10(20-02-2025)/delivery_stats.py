@@ -0,0 +1,151 @@
+'''
+Streaming batsman statistics for deliveries.csv
+
+The notebook does
+    delivery.groupby('batsman')['batsman_runs'].sum()
+    delivery[delivery['batsman_runs']==6].groupby('batsman')['batsman_runs'].count()
+which needs the whole ball by ball file in memory.
+
+Here the file is read in fixed size chunks. Every chunk gives a partial aggregate
+(runs, balls, fours, sixes per batsman) and partial aggregates are merged, so memory
+depends on the chunk size and the number of batsmen, not on the file size.
+'''
+
+import csv
+import sys
+import time
+import tracemalloc
+from itertools import islice
+from typing import Dict, Iterator, List, Tuple
+
+RUNS, BALLS, FOURS, SIXES = range(4)
+
+INT_FIELDS = {'match_id', 'inning', 'over', 'ball', 'is_super_over', 'wide_runs', 'bye_runs', 'legbye_runs',
+              'noball_runs', 'penalty_runs', 'batsman_runs', 'extra_runs', 'total_runs'}
+
+
+class BatsmanStats:
+    """Mergeable partial aggregate : batsman -> [runs, balls, fours, sixes]"""
+    def __init__(self):
+        self.stats: Dict[str, List[int]] = {}
+
+    def update(self, rows: List[Tuple[str, int]]):
+        """Add (batsman, batsman_runs) rows"""
+        stats = self.stats
+        for batsman, runs in rows:
+            s = stats.get(batsman)
+            if s is None:
+                s = stats[batsman] = [0, 0, 0, 0]
+            s[RUNS] += runs
+            s[BALLS] += 1
+            if runs == 4:
+                s[FOURS] += 1
+            elif runs == 6:
+                s[SIXES] += 1
+
+    def merge(self, other: 'BatsmanStats') -> 'BatsmanStats':
+        """Add another partial aggregate into this one"""
+        stats = self.stats
+        for batsman, o in other.stats.items():
+            s = stats.get(batsman)
+            if s is None:
+                stats[batsman] = list(o)
+            else:
+                for i in range(4):
+                    s[i] += o[i]
+        return self
+
+    def column(self, field: int) -> Dict[str, int]:
+        return {batsman: s[field] for batsman, s in self.stats.items()}
+
+    def runs(self) -> Dict[str, int]:
+        """Same values as delivery.groupby('batsman')['batsman_runs'].sum()"""
+        return self.column(RUNS)
+
+    def balls(self) -> Dict[str, int]:
+        """Same values as delivery.groupby('batsman')['batsman_runs'].count()"""
+        return self.column(BALLS)
+
+    def fours(self) -> Dict[str, int]:
+        return self.column(FOURS)
+
+    def sixes(self) -> Dict[str, int]:
+        return self.column(SIXES)
+
+    def top(self, field=RUNS, n=5) -> List[Tuple[str, int]]:
+        """Same as .sort_values(ascending=False).head(n)"""
+        return sorted(self.column(field).items(), key=lambda item: item[1], reverse=True)[:n]
+
+
+def read_chunks(path: str, chunk_size=100_000, columns=('batsman', 'batsman_runs')) -> Iterator[List[tuple]]:
+    """Yield lists of at most chunk_size rows, keeping only the given columns (int columns are converted)"""
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        positions = [header.index(name) for name in columns]
+        converters = [int if name in INT_FIELDS else str for name in columns]
+        while True:
+            chunk = [tuple(convert(row[i]) for convert, i in zip(converters, positions))
+                     for row in islice(reader, chunk_size)]
+            if not chunk:
+                return
+            yield chunk
+
+
+def stream_batsman_stats(path: str, chunk_size=100_000) -> BatsmanStats:
+    """Batsman runs, balls, fours and sixes of a deliveries csv, one chunk at a time"""
+    total = BatsmanStats()
+    for chunk in read_chunks(path, chunk_size):
+        partial = BatsmanStats()
+        partial.update(chunk)
+        total.merge(partial)
+    return total
+
+
+def in_memory_batsman_stats(path: str) -> BatsmanStats:
+    """Reference : load every row first, then aggregate (what the notebook does)"""
+    with open(path, newline='') as f:
+        rows = [(r['batsman'], int(r['batsman_runs'])) for r in csv.DictReader(f)]
+    total = BatsmanStats()
+    total.update(rows)
+    return total
+
+
+def check_against_pandas(path: str, stats: BatsmanStats):
+    try:
+        import pandas as pd
+    except ImportError:
+        print("pandas not installed, skipping groupby check")
+        return
+    delivery = pd.read_csv(path)
+    assert stats.runs() == delivery.groupby('batsman')['batsman_runs'].sum().to_dict()
+    assert stats.balls() == delivery.groupby('batsman')['batsman_runs'].count().to_dict()
+    sixes = delivery[delivery['batsman_runs'] == 6].groupby('batsman')['batsman_runs'].count().to_dict()
+    assert {b: n for b, n in stats.sixes().items() if n} == sixes
+    print("matches pandas groupby")
+
+
+def peak_memory(fn, *args):
+    """(result, seconds, peak traced bytes)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+if __name__ == '__main__':
+    path = sys.argv[1] if len(sys.argv) > 1 else 'deliveries.csv'
+    chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else 50_000
+
+    streamed, seconds, peak = peak_memory(stream_batsman_stats, path, chunk_size)
+    print(f"streaming: {seconds:.2f} seconds, peak {peak / 2**20:.1f} MB")
+    loaded, seconds, peak = peak_memory(in_memory_batsman_stats, path)
+    print(f"in memory: {seconds:.2f} seconds, peak {peak / 2**20:.1f} MB")
+    assert streamed.stats == loaded.stats
+    check_against_pandas(path, streamed)
+
+    print(streamed.top(RUNS))
+    print(streamed.top(SIXES))
@@ -26,36 +26,57 @@
 # result = solution.productExceptSelf(nums)
 # print(result)  # Output: [24, 12, 8, 6]
 
+import os
+import sys
 from typing import List
 
+if __name__ == '__main__':
+    # run as a script : tracing.py is in the repo root, appended so nothing in this folder is shadowed.
+    # Importers put the root on sys.path themselves, importing this module never changes it.
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tracing import DEBUG, get_tracer
+
+tracer = get_tracer('lc238')
+
+
 class Solution:
     def productExceptSelf(self, nums: List[int]) -> List[int]:
         n = len(nums)
         ans = [1] * n  # Initialize with 1s
         left_product = 1
+        debug = tracer.enabled(DEBUG)  # checked once, not on every step
+        trace = tracer.emit
 
         # Left to right pass
-        print("Left to Right Pass:")
+        if debug:
+            trace("Left to Right Pass:")
         for i in range(n):
             ans[i] = left_product
-            print(f"i: {i}, ans: {ans}, left_product: {left_product}")
+            if debug:
+                trace(f"i: {i}, ans: {ans}, left_product: {left_product}")
             left_product *= nums[i]
-            print(f"Updated left_product after multiplying with nums[{i}] ({nums[i]}): {left_product}")
+            if debug:
+                trace(f"Updated left_product after multiplying with nums[{i}] ({nums[i]}): {left_product}")
 
         right_product = 1
 
         # Right to left pass
-        print("\nRight to Left Pass:")
+        if debug:
+            trace("\nRight to Left Pass:")
         for i in range(n - 1, -1, -1):
             ans[i] *= right_product
-            print(f"i: {i}, ans: {ans}, right_product: {right_product}")
+            if debug:
+                trace(f"i: {i}, ans: {ans}, right_product: {right_product}")
             right_product *= nums[i]
-            print(f"Updated right_product after multiplying with nums[{i}] ({nums[i]}): {right_product}")
+            if debug:
+                trace(f"Updated right_product after multiplying with nums[{i}] ({nums[i]}): {right_product}")
 
         return ans
 
 # Example usage:
-nums = [1, 2, 3, 4]
-solution = Solution()
-result = solution.productExceptSelf(nums)
-print("\nFinal Result:", result)  # Output: [24, 12, 8, 6]
+if __name__ == '__main__':
+    tracer.set_level(DEBUG)
+    nums = [1, 2, 3, 4]
+    solution = Solution()
+    result = solution.productExceptSelf(nums)
+    print("\nFinal Result:", result)  # Output: [24, 12, 8, 6]
@@ -0,0 +1,163 @@
+'''
+Incremental leaderboards
+
+The notebook recomputes every leaderboard from scratch :
+    runs.sort_values(ascending=False).head(5)
+    ....drop_duplicates(subset='season', keep='first')
+Here every season keeps a TopK per leaderboard (runs, sixes, team wins) that is updated
+as match and delivery rows arrive, queries read the K entries directly.
+'''
+
+import csv
+import heapq
+import sys
+import time
+from typing import Dict, Hashable, Iterable, List, Tuple
+
+from delivery_stats import read_chunks
+
+
+class TopK:
+    """
+    Counters with the K highest kept up to date.
+
+    Counts only grow, so a key outside the top can only enter it when it is itself updated.
+    The top keys sit in a min heap, an update of a top key pushes a new entry and the old
+    one is skipped when it reaches the heap top (O(log K) amortized per update).
+    """
+    def __init__(self, k=5):
+        if k < 1:
+            raise ValueError("k must be >= 1")
+        self.k = k
+        self.scores: Dict[Hashable, int] = {}  # every key -> count
+        self.members: Dict[Hashable, int] = {}  # keys in the top -> count
+        self.heap: List[Tuple[int, Hashable]] = []  # (count, key), may hold stale entries
+
+    def add(self, key: Hashable, amount=1):
+        if amount < 0:
+            raise ValueError("TopK counts can only grow")
+        if amount == 0:
+            return
+        score = self.scores.get(key, 0) + amount
+        self.scores[key] = score
+        members = self.members
+
+        if key in members or len(members) < self.k:
+            members[key] = score
+            heapq.heappush(self.heap, (score, key))
+            if len(self.heap) > 2 * self.k + 8:
+                self._compact()
+            return
+
+        lowest_score, lowest_key = self._lowest()
+        if score > lowest_score:
+            heapq.heapreplace(self.heap, (score, key))
+            del members[lowest_key]
+            members[key] = score
+
+    def _lowest(self) -> Tuple[int, Hashable]:
+        heap, members = self.heap, self.members
+        while members.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)  # stale entry
+        return heap[0]
+
+    def _compact(self):
+        self.heap = [(score, key) for key, score in self.members.items()]
+        heapq.heapify(self.heap)
+
+    def top(self, n=None) -> List[Tuple[Hashable, int]]:
+        """Highest counts first (n <= k)"""
+        ranked = sorted(self.members.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:n]
+
+    def __getitem__(self, key):
+        return self.scores.get(key, 0)
+
+
+class LeaderboardService:
+    """Per season runs, sixes and team wins leaderboards, fed with new rows"""
+    def __init__(self, k=5):
+        if k < 1:  # checked here too : the TopK of a season are only built on its first row
+            raise ValueError("k must be >= 1")
+        self.k = k
+        self.season_of: Dict[int, int] = {}  # match_id -> season
+        self.runs: Dict[int, TopK] = {}
+        self.sixes: Dict[int, TopK] = {}
+        self.wins: Dict[int, TopK] = {}
+
+    def _board(self, boards: Dict[int, TopK], season: int) -> TopK:
+        board = boards.get(season)
+        if board is None:
+            board = boards[season] = TopK(self.k)
+        return board
+
+    def add_match(self, match_id: int, season: int, winner: str):
+        self.season_of[match_id] = season
+        self._board(self.runs, season)
+        self._board(self.sixes, season)
+        wins = self._board(self.wins, season)
+        if winner:
+            wins.add(winner)
+
+    def add_matches(self, records: Iterable[Dict[str, str]]):
+        """Rows of matches.csv (csv.DictReader records)"""
+        for r in records:
+            self.add_match(int(r['id']), int(r['season']), r['winner'])
+
+    def add_deliveries(self, rows: Iterable[Tuple[int, str, int]]):
+        """(match_id, batsman, batsman_runs) rows, the match must be added first"""
+        season_of = self.season_of
+        for match_id, batsman, runs in rows:
+            season = season_of.get(match_id)
+            if season is None:
+                continue
+            self.runs[season].add(batsman, runs)
+            if runs == 6:
+                self.sixes[season].add(batsman)
+
+    @classmethod
+    def from_files(cls, matches_path='matches.csv', deliveries_path='deliveries.csv', k=5) -> 'LeaderboardService':
+        service = cls(k)
+        with open(matches_path, newline='') as f:
+            service.add_matches(csv.DictReader(f))
+        for chunk in read_chunks(deliveries_path, columns=('match_id', 'batsman', 'batsman_runs')):
+            service.add_deliveries(chunk)
+        return service
+
+    def top_run_scorers(self, season: int, n=None):
+        return self.runs[season].top(n)
+
+    def top_six_hitters(self, season: int, n=None):
+        return self.sixes[season].top(n)
+
+    def most_wins(self, season: int, n=None):
+        return self.wins[season].top(n)
+
+    def orange_caps(self) -> Dict[int, Tuple[str, int]]:
+        """Top scorer of every season"""
+        return {season: board.top(1)[0] for season, board in sorted(self.runs.items()) if board.members}
+
+
+if __name__ == '__main__':
+    from season_stats import orange_caps, season_batsman_runs
+    from match_store import MatchStore
+
+    deliveries_path = sys.argv[1] if len(sys.argv) > 1 else 'deliveries.csv'
+    start = time.perf_counter()
+    service = LeaderboardService.from_files('matches.csv', deliveries_path)
+    print(f"ingest: {time.perf_counter() - start:.2f} seconds")
+
+    start = time.perf_counter()
+    caps = service.orange_caps()
+    print(f"orange caps from leaderboards: {(time.perf_counter() - start) * 1e6:.0f} us")
+
+    start = time.perf_counter()
+    runs = season_batsman_runs(deliveries_path, MatchStore.load('matches.csv'))
+    ranked = sorted(runs.items(), key=lambda item: item[1], reverse=True)
+    print(f"orange caps recomputed with a full sort: {time.perf_counter() - start:.2f} seconds")
+    assert {s: r for s, (_, r) in caps.items()} == {s: r for s, (_, r) in orange_caps(runs).items()}
+
+    for season in sorted(service.runs):
+        top_runs = [(b, r) for (s, b), r in ranked if s == season][:5]
+        assert [r for _, r in service.top_run_scorers(season)] == [r for _, r in top_runs]
+        print(season, service.top_run_scorers(season, 1), service.top_six_hitters(season, 1), service.most_wins(season, 1))
@@ -0,0 +1,153 @@
+'''
+Cached query API for the notebook helpers
+
+    def get_city_match_count(city):
+        mask=data['city']==city
+        return data[mask].shape[0]
+
+    def run_scored(batsman_name):
+        vk=delivery[delivery['batsman']==batsman_name]
+        return vk.groupby('bowling_team')['batsman_runs'].sum().sort_values(ascending=False).head(3).index[0]
+
+Both re-filter the full frame on every call. MatchQueries answers them from indexes and keeps
+the results in a bounded LRU cache. Cache keys hold the dataset version, and appending
+matches or deliveries bumps the version and drops the cached results.
+'''
+
+import sys
+import time
+from array import array
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from columnar_cache import StringColumn
+from delivery_stats import read_chunks
+from match_store import MatchStore
+
+
+class QueryCache:
+    """Bounded LRU cache with hit / miss counters"""
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, compute: Callable[[], object]):
+        entries = self.entries
+        if key in entries:
+            self.hits += 1
+            entries.move_to_end(key)
+            return entries[key]
+        self.misses += 1
+        result = compute()
+        if self.maxsize > 0:
+            entries[key] = result
+            if len(entries) > self.maxsize:
+                entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self.entries), 'maxsize': self.maxsize}
+
+
+class MatchQueries:
+    """Notebook queries over matches and deliveries, cached per dataset version"""
+    def __init__(self, matches: MatchStore, cache_size=1024):
+        self.matches = matches
+        self.cache = QueryCache(cache_size)
+        # deliveries columns needed by the queries
+        self.batsman = StringColumn()
+        self.bowling_team = StringColumn()
+        self.batsman_runs = array('q')
+        self.rows_of_batsman: Dict[str, array] = {}
+        self.deliveries_version = 0
+
+    @classmethod
+    def load(cls, matches_path='matches.csv', deliveries_path: Optional[str] = 'deliveries.csv', cache_size=1024) -> 'MatchQueries':
+        queries = cls(MatchStore.load(matches_path), cache_size)
+        if deliveries_path:
+            for chunk in read_chunks(deliveries_path, columns=('batsman', 'bowling_team', 'batsman_runs')):
+                queries.append_deliveries(chunk)
+        return queries
+
+    @property
+    def version(self) -> Tuple[int, int]:
+        return self.matches.version, self.deliveries_version
+
+    def append_matches(self, records: Iterable[Dict[str, object]]):
+        for record in records:
+            self.matches.append(record)
+        self.cache.clear()
+
+    def append_deliveries(self, rows: Iterable[Tuple[str, str, int]]):
+        """(batsman, bowling_team, batsman_runs) rows"""
+        row_id = len(self.batsman_runs)
+        for batsman, bowling_team, runs in rows:
+            self.batsman.append(batsman)
+            self.bowling_team.append(bowling_team)
+            self.batsman_runs.append(runs)
+            ids = self.rows_of_batsman.get(batsman)
+            if ids is None:
+                ids = self.rows_of_batsman[batsman] = array('i')
+            ids.append(row_id)
+            row_id += 1
+        self.deliveries_version += 1
+        self.cache.clear()
+
+    def _cached(self, query: str, args: tuple, compute: Callable[[], object]):
+        return self.cache.get((query, args, self.version), compute)
+
+    def get_city_match_count(self, city: str) -> int:
+        return self._cached('get_city_match_count', (city,), lambda: self.matches.get_city_match_count(city))
+
+    def get_win_count(self, team: str) -> int:
+        return self._cached('get_win_count', (team,), lambda: self.matches.get_win_count(team))
+
+    def runs_against(self, batsman_name: str) -> List[Tuple[str, int]]:
+        """Runs of a batsman per bowling team, highest first"""
+        def compute():
+            codes, values = self.bowling_team.codes, self.bowling_team.values
+            runs = self.batsman_runs
+            totals: Dict[int, int] = {}
+            for row_id in self.rows_of_batsman.get(batsman_name, ()):
+                code = codes[row_id]
+                totals[code] = totals.get(code, 0) + runs[row_id]
+            ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)
+            return [(values[code], total) for code, total in ranked]
+        return self._cached('runs_against', (batsman_name,), compute)
+
+    def run_scored(self, batsman_name: str) -> Optional[str]:
+        """Team the batsman scored the most runs against (None for an unknown batsman)"""
+        ranked = self.runs_against(batsman_name)
+        return ranked[0][0] if ranked else None
+
+
+if __name__ == '__main__':
+    deliveries_path = sys.argv[1] if len(sys.argv) > 1 else 'deliveries.csv'
+    queries = MatchQueries.load('matches.csv', deliveries_path)
+    print(queries.get_city_match_count('Hyderabad'))
+    batsmen = list(queries.rows_of_batsman)[:20]
+    cities = ['Hyderabad', 'Pune', 'Rajkot', 'Mumbai', 'Kolkata']
+
+    # dashboard like workload : few distinct arguments, many calls
+    for cache_size in (0, 1024):
+        queries.cache = QueryCache(cache_size)
+        start = time.perf_counter()
+        for _ in range(200):
+            for batsman in batsmen:
+                queries.run_scored(batsman)
+            for city in cities:
+                queries.get_city_match_count(city)
+        seconds = time.perf_counter() - start
+        print(f"cache_size={cache_size}: {seconds:.3f} seconds, {queries.cache.stats()}")
+
+    before = queries.get_city_match_count('Hyderabad')
+    queries.append_matches([{'id': 637, 'season': 2017, 'city': 'Hyderabad', 'team1': 'Sunrisers Hyderabad',
+                             'team2': 'Mumbai Indians', 'winner': 'Mumbai Indians'}])
+    after = queries.get_city_match_count('Hyderabad')
+    assert after == before + 1
+    print(f"after append: {before} -> {after}, {queries.cache.stats()}")
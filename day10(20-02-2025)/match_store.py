@@ -0,0 +1,232 @@
+'''
+Match Store
+
+Columnar in-memory copy of matches.csv.
+Every string column (city, team1, team2, venue, ...) is dictionary encoded : one small int code per row
+and the distinct strings are stored only once.
+Numeric columns (id, season, win margins) are stored in typed int arrays.
+
+Hash indexes on city, season, team1, team2 and winner map a value to the row ids having it,
+so a count like get_city_match_count('Hyderabad') is a single dict lookup instead of a full mask.
+'''
+
+import csv
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+from columnar_cache import StringColumn, load_columns
+
+INT_COLUMNS = ('id', 'season', 'dl_applied', 'win_by_runs', 'win_by_wickets')
+INDEXED_COLUMNS = ('city', 'season', 'team1', 'team2', 'winner')
+
+EMPTY_INDEX = array('i')
+
+
+class MatchStore:
+    """Typed columnar representation of matches.csv with hash indexes"""
+    def __init__(self, header: Iterable[str], indexed=INDEXED_COLUMNS):
+        self.header = list(header)
+        self.columns = {}
+        for name in self.header:
+            if name in INT_COLUMNS:
+                self.columns[name] = array('q')
+            else:
+                self.columns[name] = StringColumn()
+        # value -> row ids, for every indexed column present in the file
+        self.indexes: Dict[str, Dict[object, array]] = {name: {} for name in indexed if name in self.columns}
+        self.lookups: Dict[tuple, array] = {}  # (column, key) -> dense lookup array
+        self.size = 0
+        self.version = 0  # bumped on every append
+
+    @classmethod
+    def from_csv(cls, path: str) -> 'MatchStore':
+        """Parse the csv once and build the columns and indexes"""
+        with open(path, newline='') as f:
+            reader = csv.reader(f)
+            store = cls(next(reader))
+            for row in reader:
+                if row:  # blank lines are skipped, like pd.read_csv does
+                    store.append_row(row)
+        return store
+
+    @classmethod
+    def load(cls, path: str, use_cache=True) -> 'MatchStore':
+        """Load through the binary snapshot of columnar_cache (re-parsed only when the csv changes)"""
+        table = load_columns(path, INT_COLUMNS, use_cache=use_cache)
+        store = cls(table.header)
+        for name in table.header:
+            column = table.columns[name]
+            # copy out of the mmap so the store stays appendable
+            if isinstance(column, StringColumn):
+                store.columns[name] = StringColumn(array('i', column.codes), list(column.values))
+            else:
+                store.columns[name] = array('q', column)
+        store.size = table.rows
+        store.build_indexes()
+        return store
+
+    def build_indexes(self):
+        """Rebuild every index from the columns"""
+        for name, index in self.indexes.items():
+            index.clear()
+            column = self.columns[name]
+            if isinstance(column, StringColumn):
+                # group by code first, then name the groups
+                by_code = [array('i') for _ in column.values]
+                for row_id, code in enumerate(column.codes):
+                    by_code[code].append(row_id)
+                for value, rows in zip(column.values, by_code):
+                    if rows:
+                        index[value] = rows
+            else:
+                for row_id, value in enumerate(column):
+                    rows = index.get(value)
+                    if rows is None:
+                        rows = index[value] = array('i')
+                    rows.append(row_id)
+
+    def append_row(self, row: List[str]):
+        """Append one csv row (list of strings, in header order, short rows padded with empty cells)"""
+        width = len(self.header)
+        if len(row) > width:
+            raise ValueError(f"row has {len(row)} fields, the header has {width}")
+        row = list(row) + [''] * (width - len(row))
+        # every value is converted before any column changes : a bad int leaves the store as it was
+        values = [(int(raw) if raw else 0) if name in INT_COLUMNS else raw for name, raw in zip(self.header, row)]
+        row_id = self.size
+        self.version += 1
+        self.lookups.clear()
+        for name, value in zip(self.header, values):
+            column = self.columns[name]
+            column.append(value)
+            index = self.indexes.get(name)
+            if index is not None:
+                rows = index.get(value)
+                if rows is None:
+                    rows = index[value] = array('i')
+                rows.append(row_id)
+        self.size += 1
+
+    def append(self, record: Dict[str, object]):
+        """Append one match given as a dict (missing columns are stored empty)"""
+        self.append_row([str(record.get(name, '')) for name in self.header])
+
+    def __len__(self):
+        return self.size
+
+    def row(self, row_id: int) -> Dict[str, object]:
+        """Decode one row back to a dict"""
+        return {name: self.columns[name][row_id] for name in self.header}
+
+    def rows_where(self, column: str, value) -> array:
+        """Row ids where column == value (needs an index on the column)"""
+        return self.indexes[column].get(value, EMPTY_INDEX)
+
+    def count_where(self, column: str, value) -> int:
+        return len(self.rows_where(column, value))
+
+    def get_city_match_count(self, city: str) -> int:
+        return self.count_where('city', city)
+
+    def get_season_match_count(self, season: int) -> int:
+        return self.count_where('season', season)
+
+    def get_team_match_count(self, team: str) -> int:
+        """Matches played by a team, as team1 or team2"""
+        return self.count_where('team1', team) + self.count_where('team2', team)
+
+    def get_win_count(self, team: str) -> int:
+        return self.count_where('winner', team)
+
+    def lookup_array(self, column: str, key='id', missing=-1) -> array:
+        """
+        Dense key -> value array, built once and reused until the next append.
+
+        lookup_array('season')[match_id] gives the season of a match without joining the frames.
+        String columns give their dictionary codes (decode with columns[column].values).
+
+        Args:
+            column: attribute to look up.
+            key: int column used as array position (match id).
+            missing: value stored for keys that are not in the store.
+        """
+        lookup = self.lookups.get((column, key))
+        if lookup is None:
+            keys = self.columns[key]
+            values = self.columns[column]
+            if isinstance(values, StringColumn):
+                values = values.codes
+            lookup = array('q', [missing]) * (max(keys, default=-1) + 1)
+            for k, value in zip(keys, values):
+                lookup[k] = value
+            self.lookups[(column, key)] = lookup
+        return lookup
+
+    def value_counts(self, column: str) -> Dict[object, int]:
+        """Same idea as data[column].value_counts(), sorted by count"""
+        counts = {value: len(rows) for value, rows in self.indexes[column].items()}
+        return dict(sorted(counts.items(), key=lambda item: item[1], reverse=True))
+
+
+def benchmark(path='matches.csv', repeat=10000, cities: Optional[List[str]] = None):
+    """Compare index lookups against the boolean mask used in the notebook"""
+    cities = cities or ['Hyderabad', 'Pune', 'Rajkot', 'Mumbai', 'Kolkata']
+
+    start = time.perf_counter()
+    store = MatchStore.from_csv(path)
+    print(f"MatchStore load: {time.perf_counter() - start:.4f} seconds ({len(store)} rows)")
+
+    MatchStore.load(path)
+    start = time.perf_counter()
+    store = MatchStore.load(path)
+    print(f"MatchStore load from snapshot: {time.perf_counter() - start:.4f} seconds")
+
+    try:
+        import pandas as pd
+        data = pd.read_csv(path)
+
+        def get_city_match_count(city):
+            mask = data['city'] == city
+            return data[mask].shape[0]
+        label = 'pandas mask'
+    except ImportError:
+        # same full scan as the mask, without pandas
+        with open(path, newline='') as f:
+            records = list(csv.DictReader(f))
+
+        def get_city_match_count(city):
+            return sum(1 for r in records if r['city'] == city)
+        label = 'row scan'
+        # the scan is slow, keep the run short
+        repeat = min(repeat, 1000)
+
+    for city in cities:
+        assert store.get_city_match_count(city) == get_city_match_count(city), city
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for city in cities:
+            get_city_match_count(city)
+    masked = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for city in cities:
+            store.get_city_match_count(city)
+    indexed = time.perf_counter() - start
+
+    calls = repeat * len(cities)
+    print(f"{label}: {masked / calls * 1e6:.2f} us per call")
+    print(f"index lookup: {indexed / calls * 1e6:.2f} us per call")
+    print(f"speedup: {masked / indexed:.0f}x")
+
+
+if __name__ == '__main__':
+    store = MatchStore.load('matches.csv')
+    print(store.get_city_match_count('Hyderabad'))
+    print(store.get_city_match_count('Pune'))
+    print(store.get_city_match_count('Rajkot'))
+    print(store.get_season_match_count(2017))
+    print(list(store.value_counts('winner').items())[:5])
+    benchmark()
@@ -0,0 +1,184 @@
+'''
+Parallel death over strike rate
+
+Notebook version (three passes over the data, single core) :
+    death_over = delivery[delivery['over'] > 15]
+    all_batsman = death_over.groupby('batsman')['batsman_runs'].count()
+    batsman_list = all_batsman[all_batsman > 200].index.tolist()
+    final = delivery[delivery['batsman'].isin(batsman_list)]
+    sr = final.groupby('batsman')['batsman_runs'].sum() / final.groupby('batsman')['batsman_runs'].count() * 100
+
+Here deliveries.csv is cut in byte ranges that end on a match_id change (the file is ordered by match),
+so every match is read by exactly one worker. Each worker makes one pass over its range and
+counts runs, balls and death over balls per batsman, the main process adds the partitions up.
+'''
+
+import csv
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+from delivery_stats import read_chunks
+
+RUNS, BALLS, DEATH_BALLS = range(3)
+
+
+def _match_id(line: bytes) -> bytes:
+    return line.split(b',', 1)[0]
+
+
+def match_partitions(path: str, parts: int) -> List[Tuple[int, int]]:
+    """Split the file body into about `parts` byte ranges, each holding whole matches"""
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        f.readline()  # header
+        body_start = f.tell()
+        bounds = [body_start]
+        for i in range(1, parts):
+            target = body_start + (size - body_start) * i // parts
+            if target <= bounds[-1]:
+                continue
+            f.seek(target)
+            f.readline()  # finish the line we landed in
+            pos = f.tell()
+            line = f.readline()
+            if not line:
+                break
+            current = _match_id(line)
+            # move to the first line of the next match
+            pos += len(line)
+            while True:
+                line = f.readline()
+                if not line or _match_id(line) != current:
+                    break
+                pos += len(line)
+            if not line:
+                break
+            bounds.append(pos)
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if start < end]
+
+
+def _header(path: str) -> List[str]:
+    with open(path, newline='') as f:
+        return next(csv.reader(f))
+
+
+def aggregate_range(path: str, start: int, end: int, death_from=16) -> Dict[str, List[int]]:
+    """One pass over a byte range : batsman -> [runs, balls, death over balls]"""
+    header = _header(path)
+    b_col, r_col, o_col = header.index('batsman'), header.index('batsman_runs'), header.index('over')
+    stats: Dict[str, List[int]] = {}
+
+    def lines():
+        with open(path, 'rb') as f:
+            f.seek(start)
+            pos = start
+            while pos < end:
+                line = f.readline()
+                if not line:
+                    return
+                pos += len(line)
+                yield line.decode()
+
+    for row in csv.reader(lines()):
+        batsman = row[b_col]
+        s = stats.get(batsman)
+        if s is None:
+            s = stats[batsman] = [0, 0, 0]
+        s[RUNS] += int(row[r_col])
+        s[BALLS] += 1
+        if int(row[o_col]) >= death_from:
+            s[DEATH_BALLS] += 1
+    return stats
+
+
+def merge(partials) -> Dict[str, List[int]]:
+    total: Dict[str, List[int]] = {}
+    for partial in partials:
+        for batsman, p in partial.items():
+            s = total.get(batsman)
+            if s is None:
+                total[batsman] = list(p)
+            else:
+                s[RUNS] += p[RUNS]
+                s[BALLS] += p[BALLS]
+                s[DEATH_BALLS] += p[DEATH_BALLS]
+    return total
+
+
+def death_over_strike_rates(path='deliveries.csv', min_balls=200, death_from=16, workers=None) -> Dict[str, float]:
+    """
+    Strike rate of every batsman who faced more than min_balls death over balls.
+
+    Args:
+        path: deliveries csv.
+        min_balls: minimum balls faced in overs >= death_from.
+        death_from: first death over (the notebook uses over > 15).
+        workers: process count, None for every core, 1 to run in this process.
+    """
+    workers = workers or os.cpu_count()
+    ranges = match_partitions(path, workers)
+    if workers == 1:
+        partials = [aggregate_range(path, start, end, death_from) for start, end in ranges]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            partials = list(pool.map(aggregate_range, [path] * len(ranges),
+                                     [start for start, _ in ranges], [end for _, end in ranges],
+                                     [death_from] * len(ranges)))
+    total = merge(partials)
+    return {batsman: s[RUNS] / s[BALLS] * 100 for batsman, s in total.items() if s[DEATH_BALLS] > min_balls}
+
+
+def three_pass_strike_rates(path='deliveries.csv', min_balls=200, death_from=16) -> Dict[str, float]:
+    """Reference, same passes as the notebook"""
+    balls_in_death: Dict[str, int] = {}
+    for chunk in read_chunks(path, columns=('batsman', 'over')):
+        for batsman, over in chunk:
+            if over >= death_from:
+                balls_in_death[batsman] = balls_in_death.get(batsman, 0) + 1
+    batsman_list = {batsman for batsman, balls in balls_in_death.items() if balls > min_balls}
+
+    runs: Dict[str, int] = {}
+    balls: Dict[str, int] = {}
+    for chunk in read_chunks(path):
+        for batsman, r in chunk:
+            if batsman in batsman_list:
+                runs[batsman] = runs.get(batsman, 0) + r
+                balls[batsman] = balls.get(batsman, 0) + 1
+    return {batsman: runs[batsman] / balls[batsman] * 100 for batsman in runs}
+
+
+def scaling_benchmark(path: str):
+    start = time.perf_counter()
+    expected = three_pass_strike_rates(path)
+    print(f"three pass, 1 core: {time.perf_counter() - start:.2f} seconds")
+
+    counts = sorted({1, 2, 4, os.cpu_count()})
+    base = None
+    for workers in counts:
+        start = time.perf_counter()
+        sr = death_over_strike_rates(path, workers=workers)
+        seconds = time.perf_counter() - start
+        base = base or seconds
+        assert sr.keys() == expected.keys()
+        assert all(abs(sr[b] - expected[b]) < 1e-9 for b in sr)
+        print(f"{workers} workers: {seconds:.2f} seconds, speedup {base / seconds:.2f}x")
+
+
+if __name__ == '__main__':
+    # python parallel_deliveries.py [scale] [deliveries.csv]
+    # scale 100 -> synthetic file 100x the season, in a temporary directory removed afterwards
+    scale = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    if len(sys.argv) > 2:
+        scaling_benchmark(sys.argv[2])
+    else:
+        from synthetic_deliveries import write_deliveries
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, f'deliveries_x{scale}.csv')
+            print(f"writing {path} ...")
+            write_deliveries(path, scale=scale)
+            scaling_benchmark(path)
@@ -0,0 +1,165 @@
+'''
+Product of array except self (leetcode 238), production variant
+
+lc238.py traces the whole `ans` list on every iteration, O(n^2) output for n values.
+Here :
+    product_except_self        silent prefix / suffix passes, exact Python ints
+    product_except_self_numpy  cumprod on int64 / float64 arrays, falls back to exact ints on overflow
+Zeros are counted first : two or more zeros give all zeros without any product,
+one zero only needs the product of the other values.
+'''
+
+import contextlib
+import io
+import math
+import os
+import random
+import sys
+import time
+from typing import List, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+INT64_BITS = 63  # |x| < 2**63 fits in int64
+
+
+def _zero_case(nums: Sequence, zeros: int) -> List:
+    n = len(nums)
+    ans = [0] * n
+    if zeros == 1:
+        i = nums.index(0)
+        ans[i] = math.prod(nums[:i]) * math.prod(nums[i + 1:])
+    return ans
+
+
+def product_except_self(nums: Sequence[int]) -> List[int]:
+    """
+    Product of all the values except nums[i], for every i, without division.
+
+    Args:
+        nums: ints (or any numbers).
+
+    Returns:
+        A list with the product of every other value at each position.
+    """
+    nums = list(nums)
+    zeros = nums.count(0)
+    if zeros:
+        return _zero_case(nums, zeros)
+
+    n = len(nums)
+    ans = [1] * n
+    left = 1
+    for i in range(n):
+        ans[i] = left
+        left *= nums[i]
+    right = 1
+    for i in range(n - 1, -1, -1):
+        ans[i] *= right
+        right *= nums[i]
+    return ans
+
+
+def fits_int64(nums) -> bool:
+    """True when no prefix / suffix product of the nonzero ints can overflow int64"""
+    values = np.abs(nums[nums != 0]).astype(np.float64)
+    # every partial product is at most the product of all |x| (each |x| >= 1)
+    return float(np.log2(values).sum()) < INT64_BITS - 1
+
+
+def product_except_self_numpy(nums):
+    """
+    NumPy cumprod version.
+
+    Int input is computed in int64 when the products are proven to fit, otherwise it falls back
+    to product_except_self (exact Python ints, returned as an object array).
+    Float input is computed in float64 as is.
+    """
+    arr = np.asarray(nums)
+    n = arr.size
+    zeros = n - np.count_nonzero(arr)
+    if zeros > 1:
+        return np.zeros(n, dtype=arr.dtype)
+    if zeros:
+        # one zero : only its own position is nonzero, the product of the other values
+        i = int(np.flatnonzero(arr == 0)[0])
+        others = np.delete(arr, i)
+        if arr.dtype.kind == 'f':
+            ans = np.zeros(n, dtype=arr.dtype)
+        elif arr.dtype.kind in 'iub' and fits_int64(others):
+            ans = np.zeros(n, dtype=np.int64)
+            others = others.astype(np.int64)
+        else:
+            return np.array(_zero_case(arr.tolist(), zeros), dtype=object)
+        ans[i] = np.prod(others)
+        return ans
+
+    if arr.dtype.kind in 'iub':
+        if not fits_int64(arr):
+            return np.array(product_except_self(arr.tolist()), dtype=object)
+        arr = arr.astype(np.int64)
+    elif arr.dtype.kind != 'f':
+        return np.array(product_except_self(arr.tolist()), dtype=object)
+
+    ans = np.ones(n, dtype=arr.dtype)
+    if n > 1:
+        ans[1:] = np.cumprod(arr[:-1])  # prefix products
+        ans[:-1] *= np.cumprod(arr[:0:-1])[::-1]  # suffix products
+    return ans
+
+
+def product_except_self_fast(nums) -> List:
+    """NumPy when installed, exact Python ints otherwise"""
+    if np is None:
+        return product_except_self(nums)
+    return product_except_self_numpy(nums).tolist()
+
+
+def benchmark(sizes=(10**3, 10**4, 10**5, 10**6, 10**7), seed=0):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if root not in sys.path:  # tracing.py (used by lc238), appended so this folder keeps precedence
+        sys.path.append(root)
+    from lc238 import Solution, tracer
+    from tracing import DEBUG
+    tracer.set_level(DEBUG)  # the original behaviour, debug output on
+    rng = random.Random(seed)
+
+    for n in sizes:
+        # mostly +-1 with a few 2 and 3, so the total product stays small like the leetcode constraint
+        nums = [rng.choice((1, -1)) for _ in range(n)]
+        for i in rng.sample(range(n), 10):
+            nums[i] = rng.choice((2, 3))
+        expected = None
+
+        if n <= 10**3:
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                expected = Solution().productExceptSelf(nums)
+            print(f"n={n:>9} lc238 with prints: {time.perf_counter() - start:.4f} seconds")
+
+        start = time.perf_counter()
+        result = product_except_self(nums)
+        print(f"n={n:>9} silent python: {time.perf_counter() - start:.4f} seconds")
+        assert expected is None or result == expected
+        expected = result
+
+        if np is not None:
+            arr = np.array(nums)
+            start = time.perf_counter()
+            result = product_except_self_numpy(arr)
+            print(f"n={n:>9} numpy: {time.perf_counter() - start:.4f} seconds")
+            assert result.tolist() == expected
+
+
+if __name__ == '__main__':
+    print(product_except_self([1, 2, 3, 4]))  # [24, 12, 8, 6]
+    print(product_except_self([-1, 1, 0, -3, 3]))  # [0, 0, 9, 0, 0]
+    print(product_except_self([0, 4, 0]))  # [0, 0, 0]
+    print(product_except_self([2**40, 2**40, 3]))  # exact big ints
+    if np is not None:
+        print(product_except_self_numpy([2**40, 2**40, 3]))  # overflow detected -> exact ints
+    max_n = int(sys.argv[1]) if len(sys.argv) > 1 else 10**7
+    benchmark([n for n in (10**3, 10**4, 10**5, 10**6, 10**7) if n <= max_n])
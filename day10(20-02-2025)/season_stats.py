@@ -0,0 +1,81 @@
+'''
+Season level batsman runs without merging deliveries and matches
+
+Orange Cap in the notebook :
+    new = delivery.merge(match, left_on='match_id', right_on='id')
+    new.groupby(['season','batsman'])['batsman_runs'].sum()
+The merge copies all 18 match columns into every delivery row only to read `season`.
+
+Here MatchStore.lookup_array('season') gives a match_id -> season array built once,
+and the deliveries are streamed in chunks with one array lookup per ball.
+'''
+
+import csv
+import sys
+from typing import Dict, Tuple
+
+from delivery_stats import peak_memory, read_chunks
+from match_store import MatchStore
+
+
+def season_batsman_runs(deliveries_path: str, store: MatchStore, chunk_size=100_000) -> Dict[Tuple[int, str], int]:
+    """(season, batsman) -> runs, same values as the groupby on the merged frame"""
+    season_of = store.lookup_array('season')
+    known = len(season_of)
+    totals: Dict[Tuple[int, str], int] = {}
+    for chunk in read_chunks(deliveries_path, chunk_size, ('match_id', 'batsman', 'batsman_runs')):
+        for match_id, batsman, runs in chunk:
+            # inner join : deliveries of unknown matches are dropped
+            season = season_of[match_id] if 0 <= match_id < known else -1
+            if season == -1:
+                continue
+            key = (season, batsman)
+            totals[key] = totals.get(key, 0) + runs
+    return totals
+
+
+def orange_caps(season_runs: Dict[Tuple[int, str], int]) -> Dict[int, Tuple[str, int]]:
+    """Top scorer of every season, sorted by season"""
+    best: Dict[int, Tuple[str, int]] = {}
+    for (season, batsman), runs in season_runs.items():
+        if season not in best or runs > best[season][1]:
+            best[season] = (batsman, runs)
+    return dict(sorted(best.items()))
+
+
+def merged_season_batsman_runs(deliveries_path: str, matches_path: str) -> Dict[Tuple[int, str], int]:
+    """Reference : materialize the joined rows like delivery.merge(match) and group them"""
+    try:
+        import pandas as pd
+        delivery = pd.read_csv(deliveries_path)
+        match = pd.read_csv(matches_path)
+        new = delivery.merge(match, left_on='match_id', right_on='id')
+        return new.groupby(['season', 'batsman'])['batsman_runs'].sum().to_dict()
+    except ImportError:
+        pass
+    with open(matches_path, newline='') as f:
+        match = {r['id']: r for r in csv.DictReader(f)}
+    with open(deliveries_path, newline='') as f:
+        new = [{**d, **match[d['match_id']]} for d in csv.DictReader(f) if d['match_id'] in match]
+    totals: Dict[Tuple[int, str], int] = {}
+    for r in new:
+        key = (int(r['season']), r['batsman'])
+        totals[key] = totals.get(key, 0) + int(r['batsman_runs'])
+    return totals
+
+
+if __name__ == '__main__':
+    deliveries_path = sys.argv[1] if len(sys.argv) > 1 else 'deliveries.csv'
+    matches_path = 'matches.csv'
+
+    def lookup_path():
+        return season_batsman_runs(deliveries_path, MatchStore.load(matches_path))
+
+    runs, seconds, peak = peak_memory(lookup_path)
+    print(f"lookup array: {seconds:.2f} seconds, peak {peak / 2**20:.1f} MB")
+    merged, seconds, peak = peak_memory(merged_season_batsman_runs, deliveries_path, matches_path)
+    print(f"merge: {seconds:.2f} seconds, peak {peak / 2**20:.1f} MB")
+    assert runs == merged
+
+    for season, (batsman, total) in orange_caps(runs).items():
+        print(season, batsman, total)
@@ -0,0 +1,76 @@
+'''
+Synthetic deliveries.csv
+
+deliveries.csv (ball by ball data of the kaggle ipl dataset) is not committed, it is downloaded
+with kagglehub. This writes a file with the same columns for the matches of matches.csv,
+so the delivery analytics can be run and benchmarked anywhere.
+
+python synthetic_deliveries.py [out_path] [scale]
+scale repeats the season with new match ids (scale=100 -> 100x bigger file)
+'''
+
+import csv
+import random
+import sys
+
+HEADER = ['match_id', 'inning', 'batting_team', 'bowling_team', 'over', 'ball', 'batsman', 'non_striker',
+          'bowler', 'is_super_over', 'wide_runs', 'bye_runs', 'legbye_runs', 'noball_runs', 'penalty_runs',
+          'batsman_runs', 'extra_runs', 'total_runs', 'player_dismissed', 'dismissal_kind', 'fielder']
+
+RUNS = [0, 1, 2, 3, 4, 6]
+RUN_WEIGHTS = [35, 38, 8, 1, 12, 6]
+
+
+def read_matches(matches_path='matches.csv'):
+    """(id, team1, team2) of every match"""
+    with open(matches_path, newline='') as f:
+        return [(int(r['id']), r['team1'], r['team2']) for r in csv.DictReader(f)]
+
+
+def innings_rows(rng, match_id, inning, batting, bowling):
+    squad = [f"{batting} {i}" for i in range(1, 12)]
+    bowlers = [f"{bowling} {i}" for i in range(7, 12)]
+    striker, non_striker, next_in = 0, 1, 2
+    for over in range(1, 21):
+        bowler = bowlers[over % len(bowlers)]
+        ball = 1
+        while ball <= 6:
+            wide = 1 if rng.random() < 0.03 else 0
+            runs = 0 if wide else rng.choices(RUNS, RUN_WEIGHTS)[0]
+            out = not wide and runs == 0 and rng.random() < 0.12 and next_in < 11
+            yield [match_id, inning, batting, bowling, over, ball, squad[striker], squad[non_striker],
+                   bowler, 0, wide, 0, 0, 0, 0, runs, wide, runs + wide,
+                   squad[striker] if out else '', 'caught' if out else '', '']
+            if wide:
+                continue
+            if out:
+                striker, next_in = next_in, next_in + 1
+            elif runs % 2:
+                striker, non_striker = non_striker, striker
+            ball += 1
+        striker, non_striker = non_striker, striker
+
+
+def write_deliveries(out_path='deliveries.csv', matches_path='matches.csv', scale=1, seed=0):
+    """Write a deliveries.csv for the matches of matches_path, scale times over"""
+    rng = random.Random(seed)
+    matches = read_matches(matches_path)
+    max_id = max(match_id for match_id, _, _ in matches)
+    rows = 0
+    with open(out_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        for copy in range(scale):
+            for match_id, team1, team2 in matches:
+                match_id += copy * max_id
+                for inning, (batting, bowling) in enumerate([(team1, team2), (team2, team1)], start=1):
+                    for row in innings_rows(rng, match_id, inning, batting, bowling):
+                        writer.writerow(row)
+                        rows += 1
+    return rows
+
+
+if __name__ == '__main__':
+    out_path = sys.argv[1] if len(sys.argv) > 1 else 'deliveries.csv'
+    scale = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    print(f"{write_deliveries(out_path, scale=scale)} deliveries written to {out_path}")
@@ -0,0 +1,140 @@
+'''
+Big factorial engine
+
+fact() in fact.py multiplies 1..n one by one : the running product keeps growing, so every step
+is a big int times a small int and the total cost is quadratic in the size of n!.
+
+Here :
+    product_range(lo, hi)  lo * (lo+1) * ... * (hi-1) by binary splitting (balanced product tree)
+    FactorialCache         keeps computed factorials as checkpoints, fact(n) starts from the
+                           closest checkpoint below n
+    fact_many([n1, ...])   sorts the queries and builds each one from the previous one
+'''
+
+import bisect
+import contextlib
+import io
+import math
+import sys
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List
+
+SMALL_RANGE = 16  # below this a plain loop is faster than splitting
+
+
+def product_range(lo: int, hi: int) -> int:
+    """Product of lo..hi-1 (1 for an empty range)"""
+    if hi - lo <= SMALL_RANGE:
+        p = 1
+        for i in range(lo, hi):
+            p *= i
+        return p
+    mid = (lo + hi) // 2
+    return product_range(lo, mid) * product_range(mid, hi)
+
+
+class FactorialCache:
+    """Factorials with up to max_checkpoints computed values kept (least recently used dropped)"""
+    def __init__(self, max_checkpoints=64):
+        self.max_checkpoints = max_checkpoints
+        self.checkpoints: OrderedDict = OrderedDict({0: 1})
+        self.keys: List[int] = [0]  # sorted checkpoint keys
+
+    def _closest(self, n: int) -> int:
+        """Largest checkpoint <= n"""
+        return self.keys[bisect.bisect_right(self.keys, n) - 1]
+
+    def _store(self, n: int, value: int):
+        if n in self.checkpoints:
+            self.checkpoints.move_to_end(n)
+            return
+        self.checkpoints[n] = value
+        bisect.insort(self.keys, n)
+        if len(self.checkpoints) > self.max_checkpoints:
+            old, _ = self.checkpoints.popitem(last=False)
+            if old == 0:  # 0! = 1 is the fallback start, keep it
+                self.checkpoints[0] = 1
+                old, _ = self.checkpoints.popitem(last=False)
+            self.keys.remove(old)
+
+    def fact(self, n: int) -> int:
+        if n < 0:
+            raise ValueError("factorial of a negative number")
+        start = self._closest(n)
+        value = self.checkpoints[start] * product_range(start + 1, n + 1)
+        self.checkpoints.move_to_end(start)
+        self._store(n, value)
+        return value
+
+    def fact_many(self, ns: Iterable[int]) -> List[int]:
+        """Factorials of ns (in the given order), each one built from the previous smaller one"""
+        ns = list(ns)
+        results: Dict[int, int] = {}
+        prev = None
+        for n in sorted(set(ns)):
+            if n < 0:
+                raise ValueError("factorial of a negative number")
+            start = self._closest(n)
+            if prev is not None and prev > start:
+                value = results[prev] * product_range(prev + 1, n + 1)
+            else:
+                value = self.checkpoints[start] * product_range(start + 1, n + 1)
+            results[n] = value
+            prev = n
+        for n in sorted(results)[-self.max_checkpoints // 2:]:
+            self._store(n, results[n])
+        return [results[n] for n in ns]
+
+
+_default_cache = FactorialCache()
+
+
+def fact(n: int) -> int:
+    """n! through the shared checkpoint cache"""
+    return _default_cache.fact(n)
+
+
+def fact_many(ns: Iterable[int]) -> List[int]:
+    return _default_cache.fact_many(ns)
+
+
+def timed(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def benchmark(max_n=10**6, max_loop=10**5):
+    with contextlib.redirect_stdout(io.StringIO()):
+        from fact import fact as loop_fact  # fact.py prints its example at import
+
+    n = 10
+    while n <= max_n:
+        line = f"n={n:>8}"
+        if n <= max_loop:
+            line += f" loop: {timed(loop_fact, n):.4f}"
+        line += f" product tree: {timed(product_range, 1, n + 1):.4f}"
+        line += f" math.factorial: {timed(math.factorial, n):.4f}"
+        print(line)
+        n *= 10
+
+    queries = [max_n // 2 + i * (max_n // 20) for i in range(10)]
+    cache = FactorialCache()
+    start = time.perf_counter()
+    results = cache.fact_many(queries)
+    print(f"fact_many of {len(queries)} values up to {max(queries)}: {time.perf_counter() - start:.4f} seconds")
+    start = time.perf_counter()
+    for q in queries:
+        product_range(1, q + 1)
+    print(f"same values one by one: {time.perf_counter() - start:.4f} seconds")
+    start = time.perf_counter()
+    cache.fact(queries[-1] + 10)
+    print(f"fact(n) right after a checkpoint: {(time.perf_counter() - start) * 1e3:.2f} ms")
+    assert results[0] == math.factorial(queries[0])
+
+
+if __name__ == '__main__':
+    print(fact(10))
+    print(fact_many([5, 3, 10]))
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 10**6)
@@ -0,0 +1,247 @@
+'''
+Memory mapped reading of large files
+
+f.readlines() (day4_basics.py) builds a list with every line of the file : a 200 MB file
+with 500,000 lines (the gen.py notes) becomes several hundred MB of str objects.
+MappedFile maps the file instead, the OS pages it in and out as it is read :
+
+    with MappedFile('big.txt') as mf:
+        for line in mf.iter_lines(): ...           bytes lines, one at a time
+        for window in mf.iter_windows(1 << 20): ...   fixed size byte windows
+        mf.build_index()                           array of line start offsets
+        mf.line(123456)                            random access to line N
+        mf.shards(4)                               byte ranges cut on line ends, one per worker
+
+shards() + count_lines_range() show the parallel pattern : every worker maps the file itself
+and only reads its own (start, end) range.
+'''
+
+import mmap
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+
+class MappedFile:
+    """Read only memory map of a file"""
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.size = os.fstat(self.file.fileno()).st_size
+        # an empty file cannot be mapped, an empty bytes object reads the same way
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b''
+        self.offsets: Optional[array] = None
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+    def __enter__(self) -> 'MappedFile':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def iter_lines(self, start=0, end: Optional[int] = None, keepends=False, block=1 << 20) -> Iterator[bytes]:
+        """Lines starting in [start, end), start must be the start of a line"""
+        data = self.data
+        size = self.size
+        end = size if end is None else end
+        pos = start
+        while pos < end:
+            # a block of whole lines, split in C rather than one find() per line
+            stop = min(pos + block, end)
+            last = data.rfind(b'\n', pos, stop)
+            if last == -1:  # one line longer than the block, or the last line of the range
+                last = data.find(b'\n', stop - 1)
+                if last == -1:
+                    last = size - 1
+            lines = data[pos:last + 1].split(b'\n')
+            if lines[-1] == b'':
+                lines.pop()  # the chunk ended on a newline
+                if keepends:
+                    lines = [line + b'\n' for line in lines]
+            elif keepends:  # last line of the file, without a newline
+                lines = [line + b'\n' for line in lines[:-1]] + lines[-1:]
+            yield from lines
+            pos = last + 1
+
+    def iter_windows(self, size: int, start=0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Consecutive byte windows of size bytes (the last one can be shorter)"""
+        if size < 1:
+            raise ValueError("window size must be >= 1")
+        end = self.size if end is None else end
+        data = self.data
+        for pos in range(start, end, size):
+            yield data[pos:min(pos + size, end)]
+
+    def build_index(self) -> array:
+        """Start offset of every line, 8 bytes per line"""
+        offsets = array('q')
+        if self.size:
+            offsets.append(0)
+            find = self.data.find
+            append = offsets.append
+            pos = find(b'\n')
+            last = self.size - 1
+            while pos != -1 and pos < last:
+                append(pos + 1)
+                pos = find(b'\n', pos + 1)
+        self.offsets = offsets
+        return offsets
+
+    def __len__(self):
+        """Number of lines (builds the index)"""
+        if self.offsets is None:
+            self.build_index()
+        return len(self.offsets)
+
+    def line(self, n: int) -> bytes:
+        """Line n (0 based) without its newline"""
+        if self.offsets is None:
+            self.build_index()
+        offsets = self.offsets
+        start = offsets[n]
+        end = offsets[n + 1] - 1 if n + 1 < len(offsets) else self.size
+        if end == self.size and self.data[end - 1:end] == b'\n':
+            end -= 1
+        return self.data[start:end]
+
+    def shards(self, parts: int) -> List[Tuple[int, int]]:
+        """About `parts` (start, end) byte ranges covering the file, each made of whole lines"""
+        bounds = [0]
+        for i in range(1, parts):
+            target = self.size * i // parts
+            if target <= bounds[-1]:
+                continue
+            nl = self.data.find(b'\n', target - 1)  # target - 1 : a range may start right on a line start
+            if nl == -1 or nl + 1 >= self.size:
+                break
+            bounds.append(nl + 1)
+        bounds.append(self.size)
+        return [(start, end) for start, end in zip(bounds, bounds[1:]) if start < end]
+
+
+def count_lines_range(path: str, start: int, end: int) -> Tuple[int, int]:
+    """(lines, bytes) of one shard, run by a worker"""
+    lines = 0
+    with MappedFile(path) as mf:
+        for line in mf.iter_lines(start, end):
+            lines += 1
+    return lines, end - start
+
+
+def parallel_line_count(path: str, workers: Optional[int] = None) -> int:
+    workers = workers or os.cpu_count() or 1
+    with MappedFile(path) as mf:
+        shards = mf.shards(workers)
+    with ProcessPoolExecutor(workers) as pool:
+        results = list(pool.map(count_lines_range, [path] * len(shards), *zip(*shards)))
+    assert sum(size for _, size in results) == os.path.getsize(path)
+    return sum(lines for lines, _ in results)
+
+
+def write_lines_file(path: str, size: int, line_length=100):
+    """About size bytes of numbered lines (line_length bytes each), written in 8 MB blocks"""
+    body = b'x' * (line_length - 12)
+    written = 0
+    n = 0
+    with open(path, 'wb') as f:
+        while written < size:
+            block = b''.join(b'%010d %s\n' % (i, body) for i in range(n, n + 80_000))
+            f.write(block)
+            written += len(block)
+            n += 80_000
+
+
+def measure(fn) -> Tuple[float, float, object]:
+    """(seconds, peak traced MiB, result) of fn(), timed in a run without tracemalloc"""
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    del result
+    tracemalloc.start()
+    result = fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak / 2**20, result
+
+
+def benchmark(size_mb=1024, out_dir: Optional[str] = None):
+    """
+    readlines() against the mmap reader on a generated file of size_mb MB.
+
+    Args:
+        size_mb: size of the generated file.
+        out_dir: folder where the file is generated and kept (reused by the next run),
+            None for a temporary directory removed after the run.
+    """
+    if out_dir is None:
+        with tempfile.TemporaryDirectory() as tmp:
+            return benchmark(size_mb, tmp)
+
+    path = os.path.join(out_dir, f'lines_{size_mb}mb.txt')
+    if not os.path.exists(path) or os.path.getsize(path) < size_mb << 20:
+        start = time.perf_counter()
+        write_lines_file(path, size_mb << 20)
+        print(f"wrote {path}: {time.perf_counter() - start:.1f} seconds")
+
+    def with_readlines():
+        with open(path, 'rb') as f:
+            return len(f.readlines())
+
+    def with_file_iteration():
+        with open(path, 'rb') as f:
+            return sum(1 for _ in f)
+
+    def with_mmap_lines():
+        with MappedFile(path) as mf:
+            return sum(1 for _ in mf.iter_lines())
+
+    def with_mmap_windows():
+        with MappedFile(path) as mf:
+            return sum(w.count(b'\n') for w in mf.iter_windows(1 << 20))
+
+    def with_index():
+        with MappedFile(path) as mf:
+            return len(mf.build_index())
+
+    expected = None
+    for label, fn in (('readlines()', with_readlines), ('for line in f', with_file_iteration),
+                      ('mmap iter_lines', with_mmap_lines), ('mmap 1 MB windows', with_mmap_windows),
+                      ('mmap build_index', with_index)):
+        seconds, peak, lines = measure(fn)
+        expected = expected if expected is not None else lines
+        assert lines == expected, label
+        print(f"{size_mb} MB, {lines} lines: {label}: {seconds:.2f} s, peak {peak:.1f} MiB")
+
+    with MappedFile(path) as mf:
+        mf.build_index()
+        start = time.perf_counter()
+        for n in range(0, len(mf), max(1, len(mf) // 10_000)):
+            assert int(mf.line(n)[:10]) == n
+        print(f"random access to 10000 lines: {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    start = time.perf_counter()
+    assert parallel_line_count(path) == expected
+    print(f"parallel line count over {os.cpu_count()} shards: {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as tmp:
+        demo = os.path.join(tmp, 'lines_demo.txt')
+        with open(demo, 'wb') as f:
+            f.write(b'first\nsecond\nthird\nlast line without newline')
+        with MappedFile(demo) as mf:
+            print(list(mf.iter_lines()))
+            print(mf.line(2), len(mf), mf.shards(3))
+            print([line for start, end in mf.shards(3) for line in mf.iter_lines(start, end)])
+
+    # python mmap_reader.py [size in MB] [output folder, to keep the generated file]
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1024, sys.argv[2] if len(sys.argv) > 2 else None)
@@ -0,0 +1,177 @@
+'''
+Array backed linked list
+
+Every Node of linkedlist.py / fast_linkedlist.py is a Python object the garbage collector
+has to track and traverse. This LinkedList keeps the nodes in two parallel arrays instead :
+
+    data[i]   value of node i (machine int, array('q'))
+    next[i]   index of the next node, NIL (-1) for the end of the list
+
+Deleted slots go on a free list (chained through next[]) and are reused by the next insert,
+so the arrays only grow when no slot is free. No per node object : the GC sees two arrays.
+Same API as linkedlist.LinkedList (insert_at_end, insert_at_beginning, delete_node, display)
+plus the fast_linkedlist additions (tail, len, extend, __iter__). Values must fit an int64.
+'''
+
+import gc
+import sys
+import time
+import tracemalloc
+from array import array
+from typing import Iterable, Iterator
+
+NIL = -1
+
+
+class LinkedList:
+    """Singly Linked List stored in parallel int arrays"""
+    def __init__(self, iterable: Iterable[int] = ()):
+        self.data = array('q')
+        self.next = array('q')
+        self.head = NIL
+        self.tail = NIL
+        self.free = NIL  # first reusable slot
+        self.length = 0
+        self.extend(iterable)
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self) -> Iterator[int]:
+        data, next_ = self.data, self.next
+        i = self.head
+        while i != NIL:
+            yield data[i]
+            i = next_[i]
+
+    def _new_slot(self, value: int, next_index: int) -> int:
+        i = self.free
+        if i == NIL:
+            i = len(self.data)
+            self.data.append(value)
+            self.next.append(next_index)
+        else:
+            self.free = self.next[i]
+            self.data[i] = value
+            self.next[i] = next_index
+        return i
+
+    def insert_at_end(self, data: int):
+        """Insert a node at the end of the linked list"""
+        i = self._new_slot(data, NIL)
+        if self.tail == NIL:
+            self.head = i
+        else:
+            self.next[self.tail] = i
+        self.tail = i
+        self.length += 1
+
+    def insert_at_beginning(self, data: int):
+        """Insert a node at the beginning of the linked list"""
+        self.head = self._new_slot(data, self.head)
+        if self.tail == NIL:
+            self.tail = self.head
+        self.length += 1
+
+    def extend(self, iterable: Iterable[int]):
+        """Append every value, whole arrays at once when no slot is free"""
+        # converted first : a value that does not fit int64 raises before anything is changed
+        new = array('q', iterable)
+        if self.free != NIL:
+            for value in new:
+                self.insert_at_end(value)
+            return
+        count = len(new)
+        if not count:
+            return
+        start = len(self.data)
+        self.data.extend(new)
+        # slot i links to i + 1, the last new slot ends the list
+        self.next.extend(range(start + 1, start + count + 1))
+        self.next[-1] = NIL
+        if self.tail == NIL:
+            self.head = start
+        else:
+            self.next[self.tail] = start
+        self.tail = start + count - 1
+        self.length += count
+
+    def delete_node(self, key: int) -> bool:
+        """Delete the first node holding key, its slot goes on the free list"""
+        data, next_ = self.data, self.next
+        prev = NIL
+        i = self.head
+        while i != NIL and data[i] != key:
+            prev = i
+            i = next_[i]
+        if i == NIL:
+            return False
+        if prev == NIL:
+            self.head = next_[i]
+        else:
+            next_[prev] = next_[i]
+        if i == self.tail:
+            self.tail = prev
+        next_[i] = self.free
+        self.free = i
+        self.length -= 1
+        return True
+
+    def display(self):
+        """Print the linked list"""
+        print(" -> ".join(map(str, self)) + (" -> " if self.head != NIL else "") + "None")
+
+
+def gc_pause(rounds=5) -> float:
+    """Slowest full collection in ms, with whatever is alive right now"""
+    worst = 0.0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        gc.collect()
+        worst = max(worst, time.perf_counter() - start)
+    return worst * 1e3
+
+
+def benchmark(n=10**6):
+    import fast_linkedlist
+
+    gc.collect()
+    print(f"full gc pause with nothing built: {gc_pause():.1f} ms")
+    for label, cls in (('object nodes (fast_linkedlist)', fast_linkedlist.LinkedList), ('array nodes', LinkedList)):
+        gc.collect()
+        start = time.perf_counter()
+        lst = cls()
+        for i in range(n):
+            lst.insert_at_end(i)
+        build = time.perf_counter() - start
+        pause = gc_pause()
+        del lst
+        gc.collect()
+        tracemalloc.start()
+        lst = cls(range(n))
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        start = time.perf_counter()
+        for i in range(n // 10):
+            lst.delete_node(i)
+        for i in range(n // 10):
+            lst.insert_at_beginning(i)  # array version : reuses the freed slots
+        churn = time.perf_counter() - start
+        print(f"{label}: build {build:.3f} s, {size / n:.1f} bytes per element, "
+              f"full gc pause {pause:.1f} ms, delete + reinsert {n // 10}: {churn:.3f} s")
+        del lst
+
+
+if __name__ == '__main__':
+    llist = LinkedList()
+    llist.insert_at_end(1)
+    llist.insert_at_end(2)
+    llist.insert_at_end(3)
+    llist.insert_at_beginning(0)
+    llist.display()  # Output: 0 -> 1 -> 2 -> 3 -> None
+    llist.delete_node(2)
+    llist.display()  # Output: 0 -> 1 -> 3 -> None
+    llist.insert_at_end(4)  # reuses the slot of 2
+    llist.extend([5, 6])
+    print(list(llist), len(llist), len(llist.data))
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 10**6)
@@ -0,0 +1,359 @@
+'''
+Linked list for large sizes
+
+LinkedList in linkedlist.py walks from head on every insert_at_end (building n nodes is O(n^2))
+and its Node objects carry a __dict__. Here :
+
+    Node                   __slots__ ('data', 'next'), no per node dict
+    tail pointer + length  insert_at_end, len() in O(1)
+    extend(iterable)       bulk append, links the nodes in one loop
+    __iter__               values in order (display() prints through it)
+    find / unlink          delete_node scans once, then unlinks the found node in O(1)
+
+DoublyLinkedList(indexed=True) adds a value -> node(s) dict kept up to date on insert and
+delete, so delete_node(key) finds its node without a scan and unlinks it through node.prev.
+The index costs memory (index_benchmark() measures how much) for O(1) delete by value.
+'''
+
+import contextlib
+import gc
+import io
+import random
+import sys
+import time
+import tracemalloc
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+
+class Node:
+    """A Node of a singly linked list"""
+    __slots__ = ('data', 'next')
+
+    def __init__(self, data, next=None):
+        self.data = data
+        self.next = next
+
+
+class LinkedList:
+    """Singly Linked List with a tail pointer and a length"""
+    def __init__(self, iterable: Iterable = ()):
+        self.head: Optional[Node] = None
+        self.tail: Optional[Node] = None
+        self.length = 0
+        self.extend(iterable)
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self) -> Iterator[Any]:
+        node = self.head
+        while node is not None:
+            yield node.data
+            node = node.next
+
+    def insert_at_end(self, data):
+        """Insert a node at the end of the linked list, O(1)"""
+        node = Node(data)
+        if self.tail is None:
+            self.head = node
+        else:
+            self.tail.next = node
+        self.tail = node
+        self.length += 1
+
+    def insert_at_beginning(self, data):
+        """Insert a node at the beginning of the linked list"""
+        self.head = Node(data, self.head)
+        if self.tail is None:
+            self.tail = self.head
+        self.length += 1
+
+    def extend(self, iterable: Iterable):
+        """Append every value of iterable"""
+        tail = self.tail
+        count = 0
+        it = iter(iterable)
+        if tail is None:
+            for data in it:
+                tail = self.head = Node(data)
+                count = 1
+                break
+        for data in it:
+            tail.next = tail = Node(data)
+            count += 1
+        self.tail = tail
+        self.length += count
+
+    def find(self, key) -> Tuple[Optional[Node], Optional[Node]]:
+        """(previous node, first node holding key), (None, None) when key is missing"""
+        prev = None
+        node = self.head
+        while node is not None and node.data != key:
+            prev = node
+            node = node.next
+        if node is None:
+            return None, None
+        return prev, node
+
+    def unlink(self, prev: Optional[Node], node: Node):
+        """Remove node (prev is its predecessor, None for the head) in O(1)"""
+        if prev is None:
+            self.head = node.next
+        else:
+            prev.next = node.next
+        if node is self.tail:
+            self.tail = prev
+        node.next = None
+        self.length -= 1
+
+    def delete_node(self, key) -> bool:
+        """Delete the first node holding key, False when there is none"""
+        head = self.head
+        if head is not None and head.data == key:  # the common queue-like case, no scan
+            self.head = head.next
+            if head is self.tail:
+                self.tail = None
+            head.next = None
+            self.length -= 1
+            return True
+        prev, node = self.find(key)
+        if node is None:
+            return False
+        self.unlink(prev, node)
+        return True
+
+    def pop_front(self):
+        """Remove and return the first value"""
+        if self.head is None:
+            raise IndexError("pop from an empty linked list")
+        node = self.head
+        self.unlink(None, node)
+        return node.data
+
+    def display(self):
+        """Print the linked list"""
+        print(" -> ".join(map(str, self)) + (" -> " if self.head else "") + "None")
+
+
+class DNode:
+    """A Node of a doubly linked list"""
+    __slots__ = ('data', 'prev', 'next')
+
+    def __init__(self, data, prev=None, next=None):
+        self.data = data
+        self.prev = prev
+        self.next = next
+
+
+class DoublyLinkedList:
+    """
+    Doubly Linked List, with an optional value -> node index.
+
+    Args:
+        iterable: initial values.
+        indexed: keep index[value] -> node (or a deque of nodes, in list order, for duplicates).
+    """
+    def __init__(self, iterable: Iterable = (), indexed=False):
+        self.head: Optional[DNode] = None
+        self.tail: Optional[DNode] = None
+        self.length = 0
+        self.index: Optional[Dict[Any, Any]] = {} if indexed else None
+        for data in iterable:
+            self.insert_at_end(data)
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self) -> Iterator[Any]:
+        node = self.head
+        while node is not None:
+            yield node.data
+            node = node.next
+
+    def _index_add(self, node: DNode, at_end: bool):
+        index = self.index
+        entry = index.get(node.data)
+        if entry is None:
+            index[node.data] = node
+        elif type(entry) is deque:
+            entry.append(node) if at_end else entry.appendleft(node)
+        else:
+            index[node.data] = deque((entry, node) if at_end else (node, entry))
+
+    def _index_remove(self, node: DNode):
+        index = self.index
+        entry = index[node.data]
+        if type(entry) is not deque:
+            del index[node.data]
+            return
+        if entry[0] is node:
+            entry.popleft()
+        else:
+            entry.remove(node)
+        if len(entry) == 1:
+            index[node.data] = entry[0]
+
+    def insert_at_end(self, data):
+        node = DNode(data, self.tail)
+        if self.tail is None:
+            self.head = node
+        else:
+            self.tail.next = node
+        self.tail = node
+        self.length += 1
+        if self.index is not None:
+            self._index_add(node, True)
+
+    def insert_at_beginning(self, data):
+        node = DNode(data, None, self.head)
+        if self.head is None:
+            self.tail = node
+        else:
+            self.head.prev = node
+        self.head = node
+        self.length += 1
+        if self.index is not None:
+            self._index_add(node, False)
+
+    def find(self, key) -> Optional[DNode]:
+        """First node holding key, from the index when there is one"""
+        if self.index is not None:
+            entry = self.index.get(key)
+            return entry[0] if type(entry) is deque else entry
+        node = self.head
+        while node is not None and node.data != key:
+            node = node.next
+        return node
+
+    def unlink(self, node: DNode):
+        """Remove node in O(1)"""
+        if node.prev is None:
+            self.head = node.next
+        else:
+            node.prev.next = node.next
+        if node.next is None:
+            self.tail = node.prev
+        else:
+            node.next.prev = node.prev
+        node.prev = node.next = None
+        self.length -= 1
+        if self.index is not None:
+            self._index_remove(node)
+
+    def delete_node(self, key) -> bool:
+        """Delete the first node holding key, False when there is none"""
+        node = self.find(key)
+        if node is None:
+            return False
+        self.unlink(node)
+        return True
+
+    def display(self):
+        """Print the linked list"""
+        print(" <-> ".join(map(str, self)) + (" <-> " if self.head else "") + "None")
+
+
+def measure(build) -> Tuple[float, int, Any]:
+    """(seconds, bytes allocated, result) of build(), timed in a run without tracemalloc"""
+    gc.collect()
+    start = time.perf_counter()
+    result = build()
+    seconds = time.perf_counter() - start
+    del result
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return seconds, size, result
+
+
+def benchmark(n=10**6, quadratic_n=10**4):
+    with contextlib.redirect_stdout(io.StringIO()):
+        import linkedlist  # prints its example at import
+
+    def build_old_at_end(count):
+        old = linkedlist.LinkedList()
+        for i in range(count):
+            old.insert_at_end(i)
+        return old
+
+    start = time.perf_counter()
+    build_old_at_end(quadratic_n)
+    old_seconds = time.perf_counter() - start
+    print(f"old insert_at_end x{quadratic_n}: {old_seconds:.3f} seconds "
+          f"(O(n^2), x{n // quadratic_n} more nodes would take ~{old_seconds * (n / quadratic_n) ** 2:.0f} seconds)")
+
+    def build_old():
+        # insert_at_beginning is the only O(1) insert of the old class
+        old = linkedlist.LinkedList()
+        for i in range(n - 1, -1, -1):
+            old.insert_at_beginning(i)
+        return old
+
+    def build_new():
+        new = LinkedList()
+        for i in range(n):
+            new.insert_at_end(i)
+        return new
+
+    old_seconds, old_bytes, old = measure(build_old)
+    new_seconds, new_bytes, new = measure(build_new)
+    extend_seconds, _, _ = measure(lambda: LinkedList(range(n)))
+    print(f"build {n} nodes: old (insert_at_beginning) {old_seconds:.3f} s, {old_bytes / n:.0f} bytes per node")
+    print(f"build {n} nodes: new insert_at_end {new_seconds:.3f} s, extend {extend_seconds:.3f} s, "
+          f"{new_bytes / n:.0f} bytes per node")
+
+    for label, lst in (('old', old), ('new', new)):
+        start = time.perf_counter()
+        for i in range(n):
+            lst.delete_node(i)
+        print(f"delete {n} nodes ({label}): {time.perf_counter() - start:.3f} seconds")
+    assert new.head is None and new.tail is None and len(new) == 0
+
+
+def index_benchmark(sizes=(10**4, 10**5, 10**6), deletes=1000):
+    """Memory and delete-by-value time of DoublyLinkedList with and without the index"""
+    rng = random.Random(0)
+    for n in sizes:
+        victims = rng.sample(range(n), deletes)
+        line = f"n={n:>8}"
+        for indexed in (False, True):
+            seconds, size, lst = measure(lambda: DoublyLinkedList(range(n), indexed=indexed))
+            if not indexed and n > 10**5:
+                batch = victims[:deletes // 10]  # each delete scans half the list on average
+            else:
+                batch = victims
+            start = time.perf_counter()
+            for v in batch:
+                lst.delete_node(v)
+            per_delete = (time.perf_counter() - start) / len(batch)
+            assert len(lst) == n - len(batch)
+            line += (f" | {'indexed' if indexed else 'plain'}: build {seconds:.3f} s, "
+                     f"{size / n:.0f} bytes per element, delete by value {per_delete * 1e6:.1f} us")
+            del lst
+        print(line)
+
+
+if __name__ == '__main__':
+    llist = LinkedList()
+    llist.insert_at_end(1)
+    llist.insert_at_end(2)
+    llist.insert_at_end(3)
+    llist.insert_at_beginning(0)
+    llist.display()  # Output: 0 -> 1 -> 2 -> 3 -> None
+    llist.delete_node(2)
+    llist.display()  # Output: 0 -> 1 -> 3 -> None
+    llist.delete_node(3)
+    llist.extend([4, 5])
+    print(list(llist), len(llist), llist.tail.data)
+
+    dlist = DoublyLinkedList([1, 2, 3, 2], indexed=True)
+    dlist.insert_at_beginning(2)
+    dlist.delete_node(2)  # the first 2, the one inserted at the beginning
+    dlist.delete_node(2)
+    dlist.display()  # Output: 1 <-> 3 <-> 2 <-> None
+
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 10**6)
+    index_benchmark()
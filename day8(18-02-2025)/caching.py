@@ -0,0 +1,612 @@
+'''
+Production caching decorator
+
+advanced_decorator (loggingfunc.py) keeps an unbounded dict, builds (args, tuple(kwargs.items()))
+up to three times per call, prints on every call and updates call_count without a lock.
+
+    @cached(maxsize=1024, ttl=60, thread_safe=True)
+    def multiply(a, b): ...
+
+    multiply.cache_info()   hits, misses, evictions, expirations, size
+    multiply.cache_clear()
+
+- one key per call (make_key), kwargs sorted so f(a=1, b=2) and f(b=2, a=1) share an entry
+- LRU eviction on maxsize entries and / or max_bytes (sizeof(value), sys.getsizeof by default)
+- ttl in seconds, an expired entry counts as a miss
+- thread_safe=True : the cache is split in `stripes` LRU stripes with one lock each, so threads
+  working on different keys rarely wait for each other (LRU order and limits are per stripe)
+- async def functions are cached too (the result is cached, not the coroutine)
+- single flight : concurrent callers missing the same key share one in flight computation
+  (async callers await the same task, threads wait for the first one) instead of all computing it
+
+persistent_cached(path) keeps the results in a sqlite file, so they survive a restart :
+- key = sha256 of the pickled (function, args, kwargs) with sets and dicts sorted, stable across
+  processes and runs for builtin containers (a set inside a custom object is not reordered)
+- eviction of the least recently used rows when max_entries / max_bytes is exceeded
+- WAL journal and a busy timeout, several processes can share one file
+- a small in-memory Cache in front of it for the hot keys
+
+concurrent_benchmark() compares it with functools.lru_cache : the C lru_cache does about 10x more
+hits per second, it is the one to use when TTL, byte limits and eviction counters are not needed.
+'''
+
+import asyncio
+import functools
+import hashlib
+import inspect
+import io
+import os
+import pickle
+import random
+import sqlite3
+import subprocess
+import sys
+import threading
+import tempfile
+import time
+from collections import OrderedDict
+from time import monotonic
+from typing import Callable, Hashable, NamedTuple, Optional
+
+MISSING = object()
+KWARGS_MARK = object()  # separates args from kwargs inside a key
+FAST_TYPES = {int, str}
+
+
+def make_key(args: tuple, kwargs: dict) -> Hashable:
+    """Hashable key of a call, computed once per call"""
+    if not kwargs:
+        if len(args) == 1 and type(args[0]) in FAST_TYPES:
+            return args[0]  # same shortcut as functools.lru_cache
+        return args
+    return args + (KWARGS_MARK,) + tuple(sorted(kwargs.items()))
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    currsize: int
+    bytes: int
+    maxsize: Optional[int]
+    coalesced: int = 0  # calls served by another caller's in flight computation
+
+
+class _Stripe:
+    """One LRU with its own lock and counters"""
+    __slots__ = ('entries', 'lock', 'bytes', 'maxsize', 'max_bytes', 'hits', 'misses', 'evictions', 'expirations')
+
+    def __init__(self, maxsize: Optional[int] = None, max_bytes: Optional[int] = None):
+        self.entries: OrderedDict = OrderedDict()  # key -> (value, expires_at, size)
+        self.lock = threading.Lock()
+        self.bytes = 0
+        self.maxsize = maxsize  # this stripe's share of the cache limits
+        self.max_bytes = max_bytes
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+
+def _share(total: Optional[int], parts: int, i: int) -> Optional[int]:
+    """Part i of total split in parts, the remainder going to the first parts"""
+    if total is None:
+        return None
+    return total // parts + (1 if i < total % parts else 0)
+
+
+class Cache:
+    """Bounded LRU / TTL store used by @cached"""
+    def __init__(self, maxsize: Optional[int] = 128, ttl: Optional[float] = None, max_bytes: Optional[int] = None,
+                 sizeof: Callable[[object], int] = sys.getsizeof, thread_safe=False, stripes=16):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        # limits are split between the stripes, never more stripes than entries (or bytes) allowed,
+        # so the stripes together hold at most maxsize entries and max_bytes bytes
+        count = stripes if thread_safe else 1
+        for limit in (maxsize, max_bytes):
+            if limit is not None:
+                count = max(1, min(count, limit))
+        self.stripes = [_Stripe(_share(maxsize, count, i), _share(max_bytes, count, i)) for i in range(count)]
+        self.coalesced = 0
+        if thread_safe:
+            self.get, self.put = self._get_locked, self._put_locked
+        else:
+            self.get, self.put = self._get, self._put
+        if maxsize == 0 or max_bytes == 0:  # like lru_cache(0) : nothing is ever stored
+            self.put = self._put_nothing
+
+    def _lookup(self, stripe: _Stripe, key):
+        entry = stripe.entries.get(key)
+        if entry is None:
+            stripe.misses += 1
+            return MISSING
+        value, expires_at, size = entry
+        if expires_at is not None and expires_at <= monotonic():
+            del stripe.entries[key]
+            stripe.bytes -= size
+            stripe.expirations += 1
+            stripe.misses += 1
+            return MISSING
+        stripe.entries.move_to_end(key)
+        stripe.hits += 1
+        return value
+
+    def _store(self, stripe: _Stripe, key, value):
+        entries = stripe.entries
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+        expires_at = None if self.ttl is None else monotonic() + self.ttl
+        old = entries.pop(key, None)
+        if old is not None:
+            stripe.bytes -= old[2]
+        entries[key] = (value, expires_at, size)
+        stripe.bytes += size
+        while entries and ((stripe.maxsize is not None and len(entries) > stripe.maxsize)
+                           or (stripe.max_bytes is not None and stripe.bytes > stripe.max_bytes)):
+            _, (_, _, evicted_size) = entries.popitem(last=False)
+            stripe.bytes -= evicted_size
+            stripe.evictions += 1
+
+    def _get(self, key):
+        """Cached value of key, or MISSING"""
+        return self._lookup(self.stripes[0], key)
+
+    def _put(self, key, value):
+        self._store(self.stripes[0], key, value)
+
+    def _put_nothing(self, key, value):
+        pass
+
+    def _get_locked(self, key):
+        stripes = self.stripes
+        stripe = stripes[hash(key) % len(stripes)]
+        with stripe.lock:
+            return self._lookup(stripe, key)
+
+    def _put_locked(self, key, value):
+        stripes = self.stripes
+        stripe = stripes[hash(key) % len(stripes)]
+        with stripe.lock:
+            self._store(stripe, key, value)
+
+    def peek(self, key):
+        """Value of a live entry or MISSING, without touching counters or LRU order"""
+        stripe = self.stripes[hash(key) % len(self.stripes)]
+        with stripe.lock:
+            entry = stripe.entries.get(key)
+        if entry is None or (entry[1] is not None and entry[1] <= monotonic()):
+            return MISSING
+        return entry[0]
+
+    def clear(self):
+        for stripe in self.stripes:
+            with stripe.lock:
+                stripe.entries.clear()
+                stripe.bytes = 0
+
+    def info(self) -> CacheInfo:
+        s = self.stripes
+        return CacheInfo(sum(x.hits for x in s), sum(x.misses for x in s), sum(x.evictions for x in s),
+                         sum(x.expirations for x in s), sum(len(x.entries) for x in s), sum(x.bytes for x in s),
+                         self.maxsize, self.coalesced)
+
+
+class _Flight:
+    """A computation other threads can wait for"""
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+def cached(maxsize: Optional[int] = 128, ttl: Optional[float] = None, max_bytes: Optional[int] = None,
+           sizeof: Callable[[object], int] = sys.getsizeof, thread_safe=False, stripes=16, single_flight=True):
+    """
+    Memoize a function (or an async def function) with a bounded LRU / TTL cache.
+
+    Args:
+        maxsize: max entries (None for no limit on the count).
+        ttl: seconds an entry stays valid (None : forever).
+        max_bytes: max total sizeof(result) (None : no limit on the size).
+        sizeof: size of a result in bytes.
+        thread_safe: lock striped cache, safe to call from many threads.
+        stripes: number of independently locked stripes in thread safe mode.
+        single_flight: coalesce concurrent misses of one key into one call
+            (async functions, and sync functions in thread safe mode).
+    """
+    def decorator(func):
+        cache = Cache(maxsize, ttl, max_bytes, sizeof, thread_safe, stripes)
+
+        if inspect.iscoroutinefunction(func):
+            wrapper = _async_wrapper(func, cache, single_flight)
+        elif thread_safe and single_flight:
+            wrapper = _single_flight_wrapper(func, cache)
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                key = make_key(args, kwargs)
+                value = cache.get(key)
+                if value is MISSING:
+                    value = func(*args, **kwargs)
+                    cache.put(key, value)
+                return value
+
+        wrapper.cache = cache
+        wrapper.cache_info = cache.info
+        wrapper.cache_clear = cache.clear
+        return wrapper
+
+    return decorator
+
+
+def _single_flight_wrapper(func, cache: Cache):
+    inflight = {}  # key -> _Flight
+    inflight_lock = threading.Lock()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = make_key(args, kwargs)
+        value = cache.get(key)
+        if value is not MISSING:
+            return value
+
+        with inflight_lock:
+            flight = inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = inflight[key] = _Flight()
+            else:
+                cache.coalesced += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            # a flight may have landed between our miss and taking the lead
+            value = cache.peek(key)
+            if value is MISSING:
+                value = func(*args, **kwargs)
+                cache.put(key, value)
+            flight.value = value
+            return value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with inflight_lock:
+                del inflight[key]
+            flight.done.set()
+
+    return wrapper
+
+
+def _async_wrapper(func, cache: Cache, single_flight: bool):
+    inflight = {}  # key -> asyncio.Task
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        key = make_key(args, kwargs)
+        value = cache.get(key)
+        if value is not MISSING:
+            return value
+        if not single_flight:
+            value = await func(*args, **kwargs)
+            cache.put(key, value)
+            return value
+
+        task = inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            inflight[key] = task
+
+            def landed(t, key=key):
+                inflight.pop(key, None)
+                if not t.cancelled() and t.exception() is None:
+                    cache.put(key, t.result())
+            task.add_done_callback(landed)
+        else:
+            cache.coalesced += 1
+        # shield : one cancelled caller does not cancel the computation of the others
+        return await asyncio.shield(task)
+
+    return wrapper
+
+
+class _Tag:
+    """Marker heading the canonical form of a set or a dict, pickled as a persistent id"""
+    __slots__ = ('name',)
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+_TAGS = {kind: _Tag(kind.__name__) for kind in (set, frozenset, dict)}
+
+
+class _KeyPickler(pickle.Pickler):
+    # a _Tag becomes a PERSID opcode, which no argument value can pickle to : ('set', (1, 2))
+    # and {1, 2} get different keys, whatever module name this file was imported under
+    def persistent_id(self, obj):
+        return obj.name if type(obj) is _Tag else None
+
+
+def _dumps(obj) -> bytes:
+    buffer = io.BytesIO()
+    _KeyPickler(buffer, protocol=4).dump(obj)
+    return buffer.getvalue()
+
+
+def _canonical(obj):
+    """
+    obj with its sets and dicts in a fixed order.
+
+    The iteration order of a set of str depends on PYTHONHASHSEED, so its pickle changes from
+    one process to the next. Members and items are sorted by the pickle of their own canonical
+    form only (members with equal pickles are never compared), which also works for values of
+    mixed types. Containers are walked through tuples, lists, sets and dicts only, a set inside
+    another kind of object is pickled as is.
+    """
+    kind = type(obj)
+    if kind is tuple or kind is list:
+        return kind(_canonical(x) for x in obj)
+    if kind is set or kind is frozenset:
+        members = sorted(((_dumps(m), m) for m in map(_canonical, obj)), key=lambda t: t[0])
+        return (_TAGS[kind], tuple(m for _, m in members))
+    if kind is dict:
+        items = sorted(((_dumps(item), item) for item in ((_canonical(k), _canonical(v)) for k, v in obj.items())),
+                       key=lambda t: t[0])
+        return (_TAGS[dict], tuple(item for _, item in items))
+    return obj
+
+
+def stable_key(name: str, args: tuple, kwargs: dict) -> bytes:
+    """sha256 of the pickled call in canonical form, the same in every process and run"""
+    return hashlib.sha256(_dumps((name, _canonical(args), _canonical(kwargs)))).digest()
+
+
+class DiskCache:
+    """
+    sqlite backed key -> value store shared by processes.
+
+    Args:
+        path: database file, created when missing.
+        max_entries: rows kept (None for no limit).
+        max_bytes: total size of the pickled values kept (None for no limit).
+        busy_timeout: seconds a writer waits for another process holding the lock.
+    """
+    def __init__(self, path: str, max_entries: Optional[int] = 10_000, max_bytes: Optional[int] = None,
+                 busy_timeout=30.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.busy_timeout = busy_timeout
+        self.local = threading.local()  # one connection per thread (and per process, see _conn)
+        self.hits = self.misses = self.evictions = 0
+        conn = self._conn()
+        with conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS cache ("
+                         "key BLOB PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+                         "last_access REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_last_access ON cache (last_access)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self.local, 'conn', None)
+        if conn is None or self.local.pid != os.getpid():  # a forked child needs its own connection
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout * 1000)}")
+            conn.isolation_level = ''  # back to implicit transactions, committed by `with conn`
+            self.local.conn, self.local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, key: bytes):
+        """Stored value of key, or MISSING"""
+        conn = self._conn()
+        row = conn.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return MISSING
+        with conn:
+            conn.execute("UPDATE cache SET last_access = ? WHERE key = ?", (time.time(), key))
+        self.hits += 1
+        return pickle.loads(row[0])
+
+    def put(self, key: bytes, value):
+        blob = pickle.dumps(value, protocol=4)
+        conn = self._conn()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO cache (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                         (key, blob, len(blob), time.time()))
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop the least recently used rows over the limits, inside the put transaction"""
+        if self.max_entries is not None:
+            (count,) = conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+            if count > self.max_entries:
+                conn.execute("DELETE FROM cache WHERE key IN "
+                             "(SELECT key FROM cache ORDER BY last_access LIMIT ?)", (count - self.max_entries,))
+                self.evictions += count - self.max_entries
+        if self.max_bytes is not None:
+            (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()
+            if total > self.max_bytes:
+                # walk from the oldest row until enough bytes are freed
+                freed = 0
+                doomed = []
+                for key, size in conn.execute("SELECT key, size FROM cache ORDER BY last_access"):
+                    doomed.append((key,))
+                    freed += size
+                    if total - freed <= self.max_bytes:
+                        break
+                conn.executemany("DELETE FROM cache WHERE key = ?", doomed)
+                self.evictions += len(doomed)
+
+    def clear(self):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM cache")
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+def persistent_cached(path: str, max_entries: Optional[int] = 10_000, max_bytes: Optional[int] = None,
+                      memory_maxsize: Optional[int] = 128):
+    """
+    Memoize a pure function in a sqlite file, results survive restarts.
+
+    Args:
+        path: database file, can be shared by several functions and processes.
+        max_entries: rows kept in the file.
+        max_bytes: total pickled size kept in the file.
+        memory_maxsize: entries of the in-process Cache in front of the file (0 to disable).
+    """
+    def decorator(func):
+        disk = DiskCache(path, max_entries, max_bytes)
+        memory = Cache(memory_maxsize, thread_safe=True) if memory_maxsize else None
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = stable_key(name, args, kwargs)
+            if memory is not None:
+                value = memory.get(key)
+                if value is not MISSING:
+                    return value
+            value = disk.get(key)
+            if value is MISSING:
+                value = func(*args, **kwargs)
+                disk.put(key, value)
+            if memory is not None:
+                memory.put(key, value)
+            return value
+
+        wrapper.disk = disk
+        wrapper.cache_clear = lambda: (disk.clear(), memory and memory.clear())
+        return wrapper
+
+    return decorator
+
+
+WARM_START_CHILD = """
+import sys, time
+sys.path.insert(0, {here!r})
+from caching import persistent_cached
+
+@persistent_cached({path!r})
+def slow_multiply(a, b):
+    time.sleep(0.01)
+    return a * b
+
+start = time.perf_counter()
+for i in range({calls}):
+    slow_multiply(i, i + 1)
+print(time.perf_counter() - start, slow_multiply.disk.hits, slow_multiply.disk.misses)
+"""
+
+
+def warm_start_benchmark(calls=200, restarts=3):
+    """The same workload in fresh interpreters sharing one cache file"""
+    with tempfile.TemporaryDirectory() as tmp:
+        code = WARM_START_CHILD.format(here=os.path.dirname(os.path.abspath(__file__)),
+                                       path=os.path.join(tmp, 'cache.sqlite'), calls=calls)
+        for run in range(restarts):
+            out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+            seconds, hits, misses = out.split()
+            print(f"process {run + 1}: {calls} calls in {float(seconds):.3f} seconds "
+                  f"(disk hits {hits}, misses {misses})")
+
+        # two processes filling the same file at once
+        procs = [subprocess.Popen([sys.executable, '-c', code.replace('range(', 'range(1000, 1000 + ')],
+                                  stdout=subprocess.PIPE, text=True) for _ in range(2)]
+        for proc in procs:
+            out, _ = proc.communicate()
+            assert proc.returncode == 0
+            print(f"concurrent process: {out.strip()}")
+
+
+def concurrent_benchmark(threads=8, calls=100_000, keys=2_000, maxsize=1_000):
+    """Throughput of @cached(thread_safe=True) and functools.lru_cache with several threads"""
+    def slow_square(x):
+        return sum(range(x % 50)) + x * x  # a few us of work on a miss
+
+    contenders = {
+        'functools.lru_cache': functools.lru_cache(maxsize)(slow_square),
+        'cached(thread_safe=True)': cached(maxsize, thread_safe=True)(slow_square),
+        'cached(ttl=60, thread_safe=True)': cached(maxsize, ttl=60, thread_safe=True)(slow_square),
+    }
+    rng = random.Random(0)
+    # skewed keys, like a real workload : some keys are hot
+    workload = [int(rng.paretovariate(1.2)) % keys for _ in range(calls)]
+
+    for label, fn in contenders.items():
+        def run():
+            for x in workload:
+                fn(x)
+        pool = [threading.Thread(target=run) for _ in range(threads)]
+        start = time.perf_counter()
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+        seconds = time.perf_counter() - start
+        info = fn.cache_info()
+        print(f"{label}: {threads * calls / seconds / 1e6:.2f}M calls per second, "
+              f"hits {info.hits}, misses {info.misses}")
+
+
+if __name__ == '__main__':
+    @cached(maxsize=2, ttl=5)
+    def multiply(a, b):
+        time.sleep(1)  # Simulate a time-consuming operation
+        return a * b
+
+    print(multiply(3, 4))  # First call
+    print(multiply(3, 4))  # Cached result
+    print(multiply(b=4, a=3))  # kwargs : other key
+    print(multiply(2, 5))  # evicts the least recently used entry
+    print(multiply.cache_info())
+
+    # compute() from day7 test.py : N concurrent callers, one underlying call
+    calls = [0]
+
+    @cached(maxsize=16)
+    async def compute():
+        calls[0] += 1
+        await asyncio.sleep(2)
+        return "Result ready"
+
+    async def main():
+        results = await asyncio.gather(*(compute() for _ in range(100)))
+        print(results[0], len(results))
+
+    asyncio.run(main())
+    assert calls[0] == 1, calls
+    print(f"100 concurrent callers, {calls[0]} call of compute(), {compute.cache_info()}")
+
+    # same with threads
+    @cached(maxsize=16, thread_safe=True)
+    def slow_multiply(a, b):
+        calls[0] += 1
+        time.sleep(0.5)
+        return a * b
+
+    calls[0] = 0
+    pool = [threading.Thread(target=slow_multiply, args=(3, 4)) for _ in range(20)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    assert calls[0] == 1, calls
+    print(f"20 threads, {calls[0]} call of slow_multiply, {slow_multiply.cache_info()}")
+
+    warm_start_benchmark()
+
+    for threads in (1, 4, 8):
+        print(f"{threads} threads")
+        concurrent_benchmark(threads)
@@ -0,0 +1,239 @@
+'''
+Decorator fusion
+
+Every decorator in the style of mydecorator (dec.py) or decorator_function (day3_decorator.py)
+adds one Python frame and packs the call into *args / **kwargs, stacking three of them pays
+that three times per call. fuse() merges the before / after hooks of several decorators into
+ONE wrapper generated with exec, with the same parameters as the wrapped function, so the
+arguments are passed straight through :
+
+    @fuse(print_hook("Start", "End"), announce_hook(), timing_hook(stats))
+    def add(a, b=1): ...
+
+generates (roughly)
+
+    def add(a, b=b_default):
+        s0 = before0(func)
+        s1 = before1(func)
+        s2 = before2(func)
+        result = func(a, b)
+        result = after2(func, s2, result)
+        result = after1(func, s1, result)
+        result = after0(func, s0, result)
+        return result
+
+Hook order is the stacking order : the first hook is the outermost decorator.
+A hook is before(func) -> state and / or after(func, state, result) -> result, either can be None.
+after hooks only run when the call returns (like the wrapper of mydecorator).
+For an async def function the wrapper is an async def too : the call is awaited, so after hooks
+see the result (and timing_hook the whole run) instead of the coroutine object.
+'''
+
+import functools
+import inspect
+import time
+from typing import Callable, List, NamedTuple, Optional
+
+
+class Hook(NamedTuple):
+    before: Optional[Callable] = None  # before(func) -> state
+    after: Optional[Callable] = None  # after(func, state, result) -> result
+
+
+def _signature_source(func, prefix: str):
+    """Parameter list and call arguments of func, defaults read from the namespace as prefix + 'default_i'"""
+    params: List[str] = []
+    call: List[str] = []
+    namespace = {}
+    kw_only_started = False
+    sig = inspect.signature(func)
+    kinds = [p.kind for p in sig.parameters.values()]
+    for i, p in enumerate(sig.parameters.values()):
+        text = p.name
+        if p.default is not p.empty:
+            namespace[f"{prefix}default_{i}"] = p.default
+            text += f"={prefix}default_{i}"
+        if p.kind is p.VAR_POSITIONAL:
+            text = f"*{p.name}"
+            call.append(f"*{p.name}")
+            kw_only_started = True
+        elif p.kind is p.VAR_KEYWORD:
+            text = f"**{p.name}"
+            call.append(f"**{p.name}")
+        elif p.kind is p.KEYWORD_ONLY:
+            if not kw_only_started:
+                params.append("*")
+                kw_only_started = True
+            call.append(f"{p.name}={p.name}")
+        else:
+            call.append(p.name)
+        params.append(text)
+        if p.kind is p.POSITIONAL_ONLY and (i + 1 == len(kinds) or kinds[i + 1] is not p.POSITIONAL_ONLY):
+            params.append("/")
+    return ", ".join(params), ", ".join(call), namespace
+
+
+def _internal_prefix(func) -> str:
+    """Prefix of the generated names, one no parameter of func starts with"""
+    try:
+        names = inspect.signature(func).parameters
+    except (TypeError, ValueError) as e:
+        raise TypeError(f"fuse() needs a callable with an inspectable signature, got {func!r}") from e
+    prefix = "_fused_"
+    while any(name.startswith(prefix) for name in names):
+        prefix = "_" + prefix
+    return prefix
+
+
+def fuse(*hooks: Hook):
+    """Decorator applying all hooks from one generated wrapper"""
+    def decorator(func):
+        # every generated name starts with a prefix no parameter uses, so `def f(_func, _result)`
+        # keeps its own arguments, and the def has a fixed name (lambdas and partials have none)
+        p = _internal_prefix(func)
+        params, call, namespace = _signature_source(func, p)
+        namespace[f"{p}func"] = func
+        is_async = inspect.iscoroutinefunction(func)
+        lines = [f"{'async def' if is_async else 'def'} {p}wrapper({params}):"]
+        for i, hook in enumerate(hooks):
+            if hook.before is None:
+                if hook.after is not None:
+                    lines.append(f"    {p}s{i} = None")
+            elif hook.after is None:  # nobody reads the state
+                namespace[f"{p}before_{i}"] = hook.before
+                lines.append(f"    {p}before_{i}({p}func)")
+            else:
+                namespace[f"{p}before_{i}"] = hook.before
+                lines.append(f"    {p}s{i} = {p}before_{i}({p}func)")
+        lines.append(f"    {p}result = {'await ' if is_async else ''}{p}func({call})")
+        for i in reversed(range(len(hooks))):
+            if hooks[i].after is not None:
+                namespace[f"{p}after_{i}"] = hooks[i].after
+                lines.append(f"    {p}result = {p}after_{i}({p}func, {p}s{i}, {p}result)")
+        lines.append(f"    return {p}result")
+        source = "\n".join(lines)
+        name = getattr(func, '__qualname__', type(func).__name__)
+        exec(compile(source, f"<fused {name}>", "exec"), namespace)
+        # update_wrapper copies __name__, __qualname__, __doc__... when func has them
+        wrapper = functools.update_wrapper(namespace[f"{p}wrapper"], func)
+        wrapper.__fused_source__ = source
+        return wrapper
+
+    return decorator
+
+
+def print_hook(start="Start", end="End") -> Hook:
+    """mydecorator from dec.py"""
+    def after(func, state, result):
+        print(end)
+        return result
+    return Hook(lambda func: print(start), after)
+
+
+def announce_hook() -> Hook:
+    """decorator_function from day3_decorator.py"""
+    return Hook(lambda func: print('wrapper executed this before {}'.format(func.__name__)))
+
+
+def timing_hook(totals: dict) -> Hook:
+    """Adds the duration (ns) of every call to totals[func.__name__]"""
+    clock = time.perf_counter_ns
+
+    def after(func, start, result):
+        totals[func.__name__] = totals.get(func.__name__, 0) + clock() - start
+        return result
+    return Hook(lambda func: clock(), after)
+
+
+def stacking_benchmark(calls=10**6):
+    """ns per call of three stacked *args / **kwargs decorators against the same three hooks fused"""
+    counts = {'start': 0, 'end': 0, 'announce': 0}
+    totals = {}
+    clock = time.perf_counter_ns
+
+    # the dec.py / day3 / test.py decorators, counting instead of printing so only the overhead is timed
+    def mydecorator(func):
+        def wrapper(*args, **kwargs):
+            counts['start'] += 1
+            res = func(*args, **kwargs)
+            counts['end'] += 1
+            return res
+        return wrapper
+
+    def decorator_function(original_function):
+        def wrapper_function(*args, **kwargs):
+            counts['announce'] += 1
+            return original_function(*args, **kwargs)
+        return wrapper_function
+
+    def measure(func):
+        def wrapper(*args, **kwargs):
+            start = clock()
+            result = func(*args, **kwargs)
+            totals[func.__name__] = totals.get(func.__name__, 0) + clock() - start
+            return result
+        return wrapper
+
+    def count_start(func):
+        counts['start'] += 1
+
+    def count_end(func, state, result):
+        counts['end'] += 1
+        return result
+
+    def count_announce(func):
+        counts['announce'] += 1
+
+    def add(a, b=1):
+        return a + b
+
+    stacked = mydecorator(decorator_function(measure(add)))
+    fused = fuse(Hook(count_start, count_end), Hook(count_announce), timing_hook(totals))(add)
+    assert stacked(2, b=3) == fused(2, b=3) == 5
+
+    def per_call(fn) -> float:
+        start = time.perf_counter_ns()
+        for i in range(calls):
+            fn(i, 2)
+        return (time.perf_counter_ns() - start) / calls
+
+    base = per_call(add)
+    for label, fn in (('3 stacked decorators', stacked), ('fused', fused)):
+        print(f"{label}: +{per_call(fn) - base:.0f} ns per call (plain call {base:.0f} ns)")
+
+
+if __name__ == '__main__':
+    @fuse(print_hook(), announce_hook())
+    def add(a, b):
+        return a + b
+
+    print(add(1, 2))
+    print(inspect.signature(add))
+    print(add.__fused_source__)
+
+    def area(width, /, height=2, *rest, unit="cm", **options):
+        return f"{width * height}{unit}"
+
+    fused_area = fuse(Hook())(area)
+    assert inspect.signature(fused_area, follow_wrapped=False) == inspect.signature(area)
+    assert fused_area(3) == area(3) and fused_area(3, 4, unit="m") == "12m"
+
+    # parameters named like the generated locals, lambdas and partials
+    def clash(_fused_func, _fused_result=3):
+        return _fused_func + _fused_result
+    assert fuse(Hook(), timing_hook({}))(clash)(1) == 4
+    assert fuse(announce_hook())(lambda x: x * 2)(21) == 42
+    assert fuse(Hook())(functools.partial(area, 5))(unit="m") == "10m"
+
+    # async def : awaited inside the wrapper, timed until it finishes
+    import asyncio
+
+    async def fetch(delay):
+        await asyncio.sleep(delay)
+        return delay
+    async_totals = {}
+    fused_fetch = fuse(timing_hook(async_totals))(fetch)
+    assert inspect.iscoroutinefunction(fused_fetch)
+    assert asyncio.run(fused_fetch(0.05)) == 0.05 and async_totals['fetch'] >= 0.05e9
+
+    stacking_benchmark()
@@ -1,17 +1,27 @@
 import time
 import functools
 
-def advanced_decorator(max_calls=5):
+from rate_limit import TokenBucket, max_wait_for
+
+def advanced_decorator(max_calls=5, rate=None, burst=None, on_limit='reject'):
+    # rate (calls per second) replaces the max_calls cutoff with a token bucket, see rate_limit.py.
+    # on_limit defaults to 'reject' (rate_limited defaults to 'block') : over the limit the wrapper
+    # raises right away, like the max_calls cutoff it replaces, instead of silently sleeping.
+    max_wait = max_wait_for(on_limit)  # ValueError on an unknown mode, even without a rate
+
     def decorator(func):
         cache = {}
         call_count = 0
+        bucket = TokenBucket(rate, burst) if rate is not None else None
 
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             nonlocal call_count
             call_count += 1
 
-            if call_count > max_calls:
+            if bucket is not None:
+                bucket.acquire(1.0, max_wait)
+            elif call_count > max_calls:
                 raise Exception(f"Function {func.__name__} has exceeded max call limit of {max_calls}")
 
             # Log function call details
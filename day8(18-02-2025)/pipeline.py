@@ -0,0 +1,220 @@
+'''
+Lazy streaming pipelines
+
+firstn_generator (gen.py) yields one number at a time where firstn builds the whole list, and
+day3/test.py chains filter and map into list(...). Pipeline generalizes the generator side :
+
+    total = (Pipeline.range(10**8)
+             .filter(is_even)
+             .map(square)
+             .sum())
+
+Every stage wraps the iterator of the previous one (builtin map / filter, so the per item loop
+stays in C), nothing is materialized before the sink pulls the items one by one.
+
+    source    Pipeline(iterable), Pipeline.range(n)
+    map       map(fn), filter(pred)
+    batch     batch(size) -> lists of size items, unbatch() back to items
+              map_batches(fn, size) : fn(list) -> iterable, for functions that work on chunks
+    executor  map / map_batches with executor='thread' or 'process' run the chunks in a pool,
+              at most 2 * workers chunks in flight, results in input order
+    sink      collect(), sum(), count(), reduce(fn, initial), for_each(fn), first(n)
+'''
+
+import functools
+import itertools
+import os
+import sys
+import time
+import tracemalloc
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+MISSING = object()  # no initial value for reduce(), None is a valid one
+
+
+def _batches(iterable: Iterable, size: int) -> Iterator[List[Any]]:
+    it = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _map_chunk(fn: Callable, chunk: List[Any]) -> List[Any]:
+    """Module level so process pools can pickle it"""
+    return [fn(x) for x in chunk]
+
+
+def _call_chunk(fn: Callable, chunk: List[Any]) -> List[Any]:
+    return list(fn(chunk))
+
+
+def _run_in_pool(task: Callable, fn: Callable, chunks: Iterator[List[Any]], executor: str,
+                 workers: Optional[int]) -> Iterator[List[Any]]:
+    """task(fn, chunk) for every chunk in a pool, bounded read ahead, input order kept"""
+    workers = workers or os.cpu_count() or 1
+    pool: Executor = ThreadPoolExecutor(workers) if executor == 'thread' else ProcessPoolExecutor(workers)
+    limit = 2 * workers
+    pending = deque()
+    try:
+        for chunk in chunks:
+            pending.append(pool.submit(task, fn, chunk))
+            if len(pending) >= limit:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=True)
+
+
+class Pipeline:
+    """A lazy chain of stages over an iterable"""
+    def __init__(self, source: Iterable, stages: tuple = ()):
+        self.source = source
+        self.stages = stages  # functions iterator -> iterator, applied in order
+
+    @classmethod
+    def range(cls, *args) -> 'Pipeline':
+        return cls(range(*args))
+
+    def _then(self, stage: Callable[[Iterator], Iterator]) -> 'Pipeline':
+        # a new Pipeline : a partial chain can be reused to build several pipelines
+        return Pipeline(self.source, self.stages + (stage,))
+
+    def __iter__(self) -> Iterator[Any]:
+        it = iter(self.source)
+        for stage in self.stages:
+            it = stage(it)
+        return it
+
+    # stages
+
+    def map(self, fn: Callable, executor: Optional[str] = None, workers: Optional[int] = None,
+            chunk_size=10_000) -> 'Pipeline':
+        """
+        fn over every item.
+
+        Args:
+            fn: item -> new item (picklable for executor='process').
+            executor: None (in this thread), 'thread' or 'process'.
+            workers: pool size (os.cpu_count() when None).
+            chunk_size: items sent to a worker at once.
+        """
+        if executor is None:
+            return self._then(functools.partial(map, fn))
+        return self.batch(chunk_size)._then(
+            lambda chunks: _run_in_pool(_map_chunk, fn, chunks, executor, workers)).unbatch()
+
+    def filter(self, pred: Callable[[Any], bool]) -> 'Pipeline':
+        return self._then(functools.partial(filter, pred))
+
+    def batch(self, size: int) -> 'Pipeline':
+        """Lists of size items (the last one can be shorter)"""
+        if size < 1:
+            raise ValueError("batch size must be >= 1")
+        return self._then(lambda it: _batches(it, size))
+
+    def unbatch(self) -> 'Pipeline':
+        return self._then(itertools.chain.from_iterable)
+
+    def map_batches(self, fn: Callable[[List[Any]], Iterable], size=10_000, executor: Optional[str] = None,
+                    workers: Optional[int] = None) -> 'Pipeline':
+        """fn(list of up to size items) -> iterable of results, flattened back to items"""
+        batched = self.batch(size)
+        if executor is None:
+            return batched._then(functools.partial(map, fn)).unbatch()
+        return batched._then(lambda chunks: _run_in_pool(_call_chunk, fn, chunks, executor, workers)).unbatch()
+
+    # sinks
+
+    def collect(self) -> List[Any]:
+        return list(self)
+
+    def sum(self, start=0):
+        return sum(self, start)
+
+    def count(self) -> int:
+        return sum(1 for _ in self)
+
+    def reduce(self, fn: Callable[[Any, Any], Any], initial=MISSING):
+        """functools.reduce over the items, initial=None is a real initial value"""
+        if initial is MISSING:
+            return functools.reduce(fn, self)
+        return functools.reduce(fn, self, initial)
+
+    def for_each(self, fn: Callable[[Any], Any]):
+        for item in self:
+            fn(item)
+
+    def first(self, n: int) -> List[Any]:
+        return list(itertools.islice(self, n))
+
+
+def is_even(x):
+    return x % 2 == 0
+
+
+def square(x):
+    return x**2
+
+
+def squares_of_chunk(chunk):
+    """Batched square, one call per chunk instead of one per item"""
+    return [x * x for x in chunk if x % 2 == 0]
+
+
+def busy_square(x):
+    """square with some CPU work, to give the pools something to do"""
+    for _ in range(50):
+        x = (x * x) % 1_000_003
+    return x
+
+
+def measure(fn) -> tuple:
+    """(seconds, peak traced MiB, result) of fn(), timed in a run without tracemalloc"""
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak / 2**20, result
+
+
+def benchmark(n=10**7, pool_n=2 * 10**5):
+    """sum of the squares of the even numbers below n, the day3/test.py computation"""
+    contenders = {
+        'list comprehension': lambda: sum([x**2 for x in range(n) if x % 2 == 0]),
+        'list(map(filter))': lambda: sum(list(map(square, filter(is_even, range(n))))),
+        'Pipeline filter/map': lambda: Pipeline.range(n).filter(is_even).map(square).sum(),
+        'Pipeline map_batches': lambda: Pipeline.range(n).map_batches(squares_of_chunk).sum(),
+    }
+    expected = None
+    for label, fn in contenders.items():
+        seconds, peak, result = measure(fn)
+        expected = expected if expected is not None else result
+        assert result == expected, label
+        print(f"n={n}: {label}: {seconds:.2f} s, {n / seconds / 1e6:.1f}M items per second, peak {peak:.1f} MiB")
+
+    expected = sum(map(busy_square, range(pool_n)))
+    for executor in (None, 'thread', 'process'):
+        start = time.perf_counter()
+        result = Pipeline.range(pool_n).map(busy_square, executor=executor, chunk_size=5_000).sum()
+        assert result == expected
+        print(f"n={pool_n}: map(busy_square, executor={executor}): {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == '__main__':
+    numbers = [1, 3, 10, 45, 6, 50]
+    print(Pipeline(numbers).filter(is_even).map(square).collect())  # Output: [100, 36, 2500]
+    print(Pipeline.range(10).batch(4).collect())
+    print(Pipeline.range(10**12).filter(is_even).first(5))  # lazy : never builds 10**12 items
+
+    # 10**8 from the command line : python pipeline.py 100000000
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 10**7)
@@ -0,0 +1,222 @@
+'''
+Token bucket rate limiter
+
+advanced_decorator(max_calls=...) in loggingfunc.py counts calls forever : after max_calls the
+function raises on every call, for the rest of the process. A token bucket limits the rate instead :
+
+    bucket holds up to `burst` tokens, refilled at `rate` tokens per second
+    a call takes one token, when the bucket is empty the call :
+        on_limit='block'   sleeps until a token is available (optionally up to timeout seconds)
+        on_limit='reject'  raises RateLimitExceeded right away
+    an async def function follows on_limit too : in 'block' mode it awaits its token with
+    asyncio.sleep (the event loop keeps running), in 'reject' mode it raises RateLimitExceeded
+
+    @rate_limited(rate=100, burst=10)
+    def call_service(...): ...
+
+The bucket is refilled lazily from monotonic() on every acquire, there is no timer thread.
+thread_safe=False (the default) is the single threaded fast path : no lock at all.
+thread_safe=True takes one lock per acquire, sleeping always happens outside of it.
+'''
+
+import asyncio
+import functools
+import inspect
+import statistics
+import sys
+import threading
+import time
+from time import monotonic
+from typing import Optional
+
+
+class RateLimitExceeded(Exception):
+    """No token available (on_limit='reject' or the blocking timeout expired)"""
+
+
+class TokenBucket:
+    """`burst` tokens at most, `rate` new tokens per second"""
+    def __init__(self, rate: float, burst: Optional[float] = None, thread_safe=False):
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.burst  # starts full
+        self.updated = monotonic()
+        self.lock = threading.Lock() if thread_safe else None
+        if thread_safe:
+            self.reserve = self._reserve_locked
+
+    def reserve(self, tokens=1.0, max_wait: Optional[float] = None) -> Optional[float]:
+        """
+        Take tokens, possibly from the future.
+
+        Returns:
+            seconds the caller must wait before going on (0.0 when tokens were available),
+            None when that wait would exceed max_wait (nothing is taken then).
+        """
+        now = monotonic()
+        available = self.tokens + (now - self.updated) * self.rate
+        if available > self.burst:
+            available = self.burst
+        self.updated = now
+        if available >= tokens:
+            self.tokens = available - tokens
+            return 0.0
+        wait = (tokens - available) / self.rate
+        if max_wait is not None and wait > max_wait:
+            self.tokens = available
+            return None
+        # the bucket goes negative : later callers queue behind this one, in order
+        self.tokens = available - tokens
+        return wait
+
+    def _reserve_locked(self, tokens=1.0, max_wait: Optional[float] = None) -> Optional[float]:
+        with self.lock:
+            return TokenBucket.reserve(self, tokens, max_wait)
+
+    def _exceeded(self, timeout: Optional[float]) -> RateLimitExceeded:
+        if not timeout:
+            return RateLimitExceeded(f"rate limit of {self.rate}/s exceeded")
+        return RateLimitExceeded(f"no token within {timeout} seconds (rate {self.rate}/s)")
+
+    def try_acquire(self, tokens=1.0) -> bool:
+        """Take tokens only if they are available now"""
+        return self.reserve(tokens, 0.0) is not None
+
+    def acquire(self, tokens=1.0, timeout: Optional[float] = None):
+        """Block until tokens are available, RateLimitExceeded if that takes more than timeout"""
+        wait = self.reserve(tokens, timeout)
+        if wait is None:
+            raise self._exceeded(timeout)
+        if wait:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens=1.0, timeout: Optional[float] = None):
+        """acquire() for coroutines, waits with asyncio.sleep"""
+        wait = self.reserve(tokens, timeout)
+        if wait is None:
+            raise self._exceeded(timeout)
+        if wait:
+            await asyncio.sleep(wait)
+
+
+def max_wait_for(on_limit: str, timeout: Optional[float] = None) -> Optional[float]:
+    """max_wait argument of TokenBucket.acquire for an on_limit mode, ValueError on an unknown mode"""
+    if on_limit not in ('block', 'reject'):
+        raise ValueError(f"on_limit must be 'block' or 'reject', not {on_limit!r}")
+    return 0.0 if on_limit == 'reject' else timeout
+
+
+def rate_limited(rate: float, burst: Optional[float] = None, on_limit='block', timeout: Optional[float] = None,
+                 thread_safe=False):
+    """
+    Limit the calls of a function (or an async def function) to `rate` per second.
+
+    Args:
+        rate: calls per second in the long run.
+        burst: calls allowed back to back after an idle period (rate by default, at least 1).
+        on_limit: 'block' (wait for a token) or 'reject' (raise RateLimitExceeded).
+        timeout: longest wait in 'block' mode, None to wait as long as needed.
+        thread_safe: lock the bucket, needed when several threads call the function.
+    """
+    max_wait = max_wait_for(on_limit, timeout)
+
+    def decorator(func):
+        bucket = TokenBucket(rate, burst, thread_safe)
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                await bucket.acquire_async(1.0, max_wait)
+                return await func(*args, **kwargs)
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                bucket.acquire(1.0, max_wait)
+                return func(*args, **kwargs)
+
+        wrapper.bucket = bucket
+        return wrapper
+
+    return decorator
+
+
+def throughput_benchmark(calls=10**6, threads=(1, 4, 8)):
+    """try_acquire() calls per second on a bucket that never runs dry"""
+    rate = 1e12  # tokens never run out, only the bookkeeping is measured
+    bucket = TokenBucket(rate, rate)
+    start = time.perf_counter()
+    for _ in range(calls):
+        bucket.try_acquire()
+    print(f"single thread, no lock: {calls / (time.perf_counter() - start) / 1e6:.2f}M acquires per second")
+
+    for n in threads:
+        bucket = TokenBucket(rate, rate, thread_safe=True)
+
+        def run():
+            for _ in range(calls // n):
+                bucket.try_acquire()
+        pool = [threading.Thread(target=run) for _ in range(n)]
+        start = time.perf_counter()
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+        print(f"{n} threads, locked: {calls / (time.perf_counter() - start) / 1e6:.2f}M acquires per second")
+
+
+def jitter_benchmark(rate=500, calls=1000, threads=(1, 8)):
+    """Spacing between granted calls in 'block' mode, ideal is exactly 1 / rate"""
+    for n in threads:
+        bucket = TokenBucket(rate, burst=1, thread_safe=True)
+        granted = []
+        lock = threading.Lock()
+
+        def run():
+            for _ in range(calls // n):
+                bucket.acquire()
+                t = time.perf_counter()
+                with lock:
+                    granted.append(t)
+        pool = [threading.Thread(target=run) for _ in range(n)]
+        start = time.perf_counter()
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+        seconds = time.perf_counter() - start
+        granted.sort()
+        gaps = [(b - a) * 1e6 for a, b in zip(granted, granted[1:])]
+        gaps.sort()
+        print(f"{n} threads: {len(granted) / seconds:.0f} calls per second (target {rate}), "
+              f"gap mean {statistics.mean(gaps):.0f} us, stdev {statistics.pstdev(gaps):.0f} us, "
+              f"p99 {gaps[int(len(gaps) * 0.99)]:.0f} us")
+
+
+if __name__ == '__main__':
+    @rate_limited(rate=2, burst=2, on_limit='reject')
+    def multiply(a, b):
+        return a * b
+
+    for i in range(4):
+        try:
+            print(multiply(3, 4))
+        except RateLimitExceeded as e:
+            print(e)
+    time.sleep(0.5)  # one token back
+    print(multiply(3, 4))
+
+    @rate_limited(rate=10, burst=1)
+    async def compute():
+        return "Result ready"
+
+    async def main():
+        start = time.perf_counter()
+        await asyncio.gather(*(compute() for _ in range(10)))
+        print(f"10 async calls at 10/s: {time.perf_counter() - start:.2f} seconds")
+
+    asyncio.run(main())
+
+    throughput_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 10**6)
+    jitter_benchmark()
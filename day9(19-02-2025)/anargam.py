@@ -1,6 +1,16 @@
+import os
+import sys
 from collections import defaultdict
 from typing import List
 
+if __name__ == '__main__':
+    # run as a script : tracing.py is in the repo root, appended so nothing in this folder is shadowed.
+    # Importers put the root on sys.path themselves, importing this module never changes it.
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tracing import DEBUG, get_tracer
+
+tracer = get_tracer('anargam')
+
 def groupAnagrams(strs: List[str]) -> List[List[str]]:
     """
     Groups a list of strings into sublists, where each sublist contains anagrams of each other.
@@ -13,33 +23,42 @@ def groupAnagrams(strs: List[str]) -> List[List[str]]:
     """
 
     d = defaultdict(list)  # Use defaultdict for easy grouping
+    debug = tracer.enabled(DEBUG)  # checked once, not on every string
+    trace = tracer.emit
 
-    print(f"Initial defaultdict: {d}")  # Debug: Inspect the initial state
+    if debug:
+        trace(f"Initial defaultdict: {d}")  # Debug: Inspect the initial state
 
     for s in strs:
-        print(f"Processing string: {s}")  # Debug: Track the current string
+        if debug:
+            trace(f"Processing string: {s}")  # Debug: Track the current string
 
         # Input validation: Check if the element is a string
         if not isinstance(s, str):
-            print(f"Error: Input element {s} is not a string. Skipping.") #Debug:Error message
+            if debug:
+                trace(f"Error: Input element {s} is not a string. Skipping.") #Debug:Error message
             continue
 
         k = "".join(sorted(s))  # Create a sorted string as the key
 
-        print(f"Sorted string (key): {k}")  # Debug: Inspect the generated key
+        if debug:
+            trace(f"Sorted string (key): {k}")  # Debug: Inspect the generated key
 
         d[k].append(s)  # Add the string to the corresponding list in the defaultdict
 
-        print(f"Current defaultdict state: {d}")  # Debug: See how the defaultdict is updated
+        if debug:
+            trace(f"Current defaultdict state: {d}")  # Debug: See how the defaultdict is updated
 
     result = list(d.values())  # Convert the values of the defaultdict to a list of lists
 
-    print(f"Final result: {result}")  # Debug: Inspect the final result before returning
+    if debug:
+        trace(f"Final result: {result}")  # Debug: Inspect the final result before returning
 
     return result
 
 # Example usage and testing:
 if __name__ == '__main__':
+    tracer.set_level(DEBUG)
     test_cases = [
         ["eat", "tea", "tan", "ate", "nat", "bat"],
         [""],
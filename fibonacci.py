@@ -0,0 +1,123 @@
+'''
+Fibonacci engine
+
+test.py computed fib(40) with the double recursion (hundreds of millions of calls) and
+day2_functions.fib prints every term. Here :
+
+    fib(n, mod=None)           fast doubling, O(log n) big int steps
+    fib_matrix(n, mod=None)    same value from [[1,1],[1,0]]**n (square and multiply)
+    fib_sequence(n, mod=None)  generator of F(0), F(1), ... one addition per term
+    fib_cached(n, mod=None)    fib with a bounded memo (LRU) for repeated queries
+    recursive_fib(n)           the old recursive version, kept for the benchmark
+'''
+
+import functools
+import sys
+import time
+from typing import Iterator, Optional, Tuple
+
+MEMO_SIZE = 1024
+
+
+def fib_pair(n: int, mod: Optional[int] = None) -> Tuple[int, int]:
+    """(F(n), F(n+1)) by fast doubling over the bits of n"""
+    if n < 0:
+        raise ValueError("n must be >= 0")
+    a, b = 0, 1  # F(0), F(1)
+    for bit in bin(n)[2:]:
+        # F(2k) = F(k) * (2F(k+1) - F(k)), F(2k+1) = F(k)^2 + F(k+1)^2
+        c = a * (2 * b - a)
+        d = a * a + b * b
+        if bit == '1':
+            c, d = d, c + d
+        if mod is not None:
+            c, d = c % mod, d % mod
+        a, b = c, d
+    return a, b
+
+
+def fib(n: int, mod: Optional[int] = None) -> int:
+    """n-th Fibonacci number (F(0)=0, F(1)=1), modulo mod when given"""
+    return fib_pair(n, mod)[0]
+
+
+def fib_matrix(n: int, mod: Optional[int] = None) -> int:
+    """n-th Fibonacci number from the n-th power of [[1,1],[1,0]]"""
+    if n < 0:
+        raise ValueError("n must be >= 0")
+
+    def mul(x, y):
+        r = (x[0] * y[0] + x[1] * y[2], x[0] * y[1] + x[1] * y[3],
+             x[2] * y[0] + x[3] * y[2], x[2] * y[1] + x[3] * y[3])
+        return r if mod is None else tuple(v % mod for v in r)
+
+    result = (1, 0, 0, 1)
+    base = (1, 1, 1, 0)
+    while n:
+        if n & 1:
+            result = mul(result, base)
+        base = mul(base, base)
+        n >>= 1
+    return result[1]
+
+
+def fib_sequence(n: Optional[int] = None, mod: Optional[int] = None) -> Iterator[int]:
+    """F(0), F(1), ... F(n-1), endless when n is None"""
+    a, b = 0, 1
+    if mod is not None:
+        a, b = a % mod, b % mod  # mod=1 : every term is 0
+    count = 0
+    while n is None or count < n:
+        yield a
+        a, b = b, a + b
+        if mod is not None:
+            b %= mod
+        count += 1
+
+
+@functools.lru_cache(maxsize=MEMO_SIZE)
+def fib_cached(n: int, mod: Optional[int] = None) -> int:
+    """fib with the last MEMO_SIZE distinct queries memoized"""
+    return fib(n, mod)
+
+
+def recursive_fib(n):
+    """Double recursion from test.py, O(phi**n) calls"""
+    if n == 0:
+        return 0
+    elif n == 1:
+        return 1
+    else:
+        return recursive_fib(n-1) + recursive_fib(n-2)
+
+
+def timed(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def benchmark(max_n=10**6, max_recursive=30):
+    for n in (10, 20, max_recursive):
+        assert recursive_fib(n) == fib(n)
+        print(f"n={n:>8} recursive_fib: {timed(recursive_fib, n):.4f} seconds")
+
+    n = 10
+    while n <= max_n:
+        expected = fib(n)
+        assert fib_matrix(n) == expected
+        assert fib(n, 10**9 + 7) == expected % (10**9 + 7)
+        line = (f"n={n:>8} fast doubling: {timed(fib, n):.4f}, matrix: {timed(fib_matrix, n):.4f}, "
+                f"mod 1e9+7: {timed(fib, n, 10**9 + 7) * 1e6:.0f} us")
+        if n <= 10**5:
+            # the sequence generator walks every term
+            line += f", sequence: {timed(lambda: sum(1 for _ in fib_sequence(n + 1))):.4f}"
+        print(line)
+        n *= 10
+
+
+if __name__ == '__main__':
+    print(fib(40))  # 102334155, test.py needed seconds for this one
+    print(list(fib_sequence(10)))
+    print(fib(10**18, mod=10**9 + 7))
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 10**6)
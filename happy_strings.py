@@ -0,0 +1,167 @@
+'''
+Happy strings (leetcode 1415) : ranking, unranking and range enumeration
+
+A happy string uses only 'a', 'b', 'c' and never repeats a char twice in a row.
+There are 3 * 2**(n-1) of length n. In lexicographic order the first char picks one of 3 blocks
+of 2**(n-1) strings and every next char is one bit : the smaller or the larger of the two
+chars different from the previous one.
+
+    get_happy_string(n, k)  k-th string (1-based), same result as Solution.getHappyString
+    rank(s)                 inverse, the k of a happy string
+    iter_range(n, a, b)     strings k = a .. b-1, each one built from the previous by an in place
+                            increment (amortized O(1) chars changed) instead of a new unranking
+'''
+
+import contextlib
+import io
+import itertools
+import random
+import sys
+import time
+from typing import Iterator
+
+A, B, C = b'abc'
+# previous char -> (smaller, larger) allowed next char
+SMALL = {A: B, B: A, C: A}
+LARGE = {A: C, B: C, C: B}
+
+
+def count(n: int) -> int:
+    """Number of happy strings of length n"""
+    return 3 << (n - 1) if n > 0 else 0
+
+
+def unrank_into(buf: bytearray, n: int, k: int) -> bool:
+    """Write the k-th happy string of length n into buf[:n], False when k is out of range"""
+    if not 1 <= k <= count(n):
+        return False
+    k -= 1
+    shift = n - 1
+    prev = buf[0] = A + (k >> shift)
+    for i in range(1, n):
+        shift -= 1
+        prev = buf[i] = LARGE[prev] if (k >> shift) & 1 else SMALL[prev]
+    return True
+
+
+def get_happy_string(n: int, k: int) -> str:
+    """k-th (1-based) happy string of length n, "" when there are fewer than k"""
+    buf = bytearray(n)
+    return buf.decode() if unrank_into(buf, n, k) else ""
+
+
+def rank(s: str) -> int:
+    """1-based position of the happy string s among the happy strings of its length"""
+    data = s.encode()
+    n = len(data)
+    if n == 0:
+        raise ValueError("empty string")
+    if data[0] not in (A, B, C):
+        raise ValueError(f"{s!r} is not a happy string")
+    k = data[0] - A
+    for prev, ch in zip(data, data[1:]):
+        if ch == SMALL[prev]:
+            k <<= 1
+        elif ch == LARGE[prev]:
+            k = (k << 1) | 1
+        else:
+            raise ValueError(f"{s!r} is not a happy string")
+    return k + 1
+
+
+def increment(buf: bytearray, n: int) -> bool:
+    """Turn buf[:n] into the next happy string in place, False after the last one"""
+    i = n - 1
+    # rightmost char that can still grow
+    while i > 0 and buf[i] == LARGE[buf[i - 1]]:
+        i -= 1
+    if i > 0:
+        buf[i] = LARGE[buf[i - 1]]
+    elif buf[0] < C:
+        buf[0] += 1
+    else:
+        return False
+    for j in range(i + 1, n):
+        buf[j] = SMALL[buf[j - 1]]
+    return True
+
+
+def iter_range(n: int, k_start: int, k_end: int) -> Iterator[str]:
+    """
+    Happy strings of length n for k_start <= k < k_end (1-based, clipped to the valid range).
+
+    Only the first one is unranked, the next ones come from increment().
+    """
+    k_start = max(k_start, 1)
+    k_end = min(k_end, count(n) + 1)
+    if k_start >= k_end:
+        return
+    buf = bytearray(n)
+    unrank_into(buf, n, k_start)
+    yield buf.decode()
+    for _ in range(k_end - k_start - 1):
+        increment(buf, n)
+        yield buf.decode()
+
+
+def brute_force(n: int):
+    """All happy strings of length n in order, from every string of 'abc'"""
+    return [''.join(p) for p in itertools.product('abc', repeat=n)
+            if all(x != y for x, y in zip(p, p[1:]))]
+
+
+def verify(max_n=8):
+    for n in range(1, max_n + 1):
+        expected = brute_force(n)
+        assert len(expected) == count(n)
+        assert [get_happy_string(n, k) for k in range(1, len(expected) + 1)] == expected
+        assert [rank(s) for s in expected] == list(range(1, len(expected) + 1))
+        assert list(iter_range(n, 1, len(expected) + 1)) == expected
+        assert list(iter_range(n, 3, 7)) == expected[2:6]
+        assert get_happy_string(n, len(expected) + 1) == ""
+    print(f"verified against brute force for n <= {max_n}")
+
+
+def benchmark(n=60, range_size=10**6, seed=0):
+    if n < 1:
+        raise ValueError("n must be >= 1")
+    rng = random.Random(seed)
+    total = count(n)
+    range_size = min(range_size, total)  # small n : the range is every string of length n
+
+    from leetcode import Solution, tracer
+    from tracing import DEBUG, OFF
+    tracer.set_level(DEBUG)
+    with contextlib.redirect_stdout(io.StringIO()):
+        k = rng.randint(1, total)
+        start = time.perf_counter()
+        expected = Solution().getHappyString(n, k)
+    print(f"n={n} Solution.getHappyString (debug output captured): {(time.perf_counter() - start) * 1e6:.0f} us")
+    tracer.set_level(OFF)
+    assert get_happy_string(n, k) == expected
+
+    ks = [rng.randint(1, total) for _ in range(10000)]
+    start = time.perf_counter()
+    for k in ks:
+        get_happy_string(n, k)
+    print(f"n={n} get_happy_string: {(time.perf_counter() - start) / len(ks) * 1e6:.2f} us per call")
+
+    k_start = rng.randint(1, total - range_size + 1)
+    start = time.perf_counter()
+    for k in range(k_start, k_start + range_size):
+        get_happy_string(n, k)
+    unranked = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in iter_range(n, k_start, k_start + range_size):
+        pass
+    streamed = time.perf_counter() - start
+    print(f"n={n} {range_size} strings, unranking each: {unranked:.2f} seconds, iter_range: {streamed:.2f} seconds")
+
+
+if __name__ == '__main__':
+    print(get_happy_string(3, 9))  # cab
+    print(rank("cab"))  # 9
+    print(list(iter_range(3, 4, 8)))
+    verify()
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 60)
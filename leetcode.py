@@ -1,52 +1,72 @@
+from tracing import DEBUG, get_tracer
+
+tracer = get_tracer('leetcode')
+
+
 class Solution:
     def getHappyString(self, n: int, k: int) -> str:
         """
         Generates the kth lexicographically happy string of length n (optimized backtracking).
         """
-        print(f"Debugging: n={n}, k={k}")  # Initial debugging
+        debug = tracer.enabled(DEBUG)  # checked once, not on every step
+        trace = tracer.emit
+
+        if debug:
+            trace(f"Debugging: n={n}, k={k}")  # Initial debugging
 
         total_happy_strings = 3 * (2**(n - 1))
-        print(f"Debugging: total_happy_strings={total_happy_strings}")
+        if debug:
+            trace(f"Debugging: total_happy_strings={total_happy_strings}")
         if k > total_happy_strings:
-            print("Debugging: k is out of range")
+            if debug:
+                trace("Debugging: k is out of range")
             return ""
 
         result = ""
         options = ['a', 'b', 'c']
 
         for i in range(n):
-            print(f"Debugging: Loop iteration i={i}")
+            if debug:
+                trace(f"Debugging: Loop iteration i={i}")
             half = (2**(n - i - 1))
-            print(f"Debugging: half={half}")
+            if debug:
+                trace(f"Debugging: half={half}")
 
             valid_chars = []
             for char in options:
                 if not result or char != result[-1]:
                     valid_chars.append(char)
-            print(f"Debugging: valid_chars={valid_chars}")
+            if debug:
+                trace(f"Debugging: valid_chars={valid_chars}")
 
             found_char = False  # Flag to check if a char was added in this iteration
             for char in valid_chars:
-                print(f"Debugging: Trying char={char}")
+                if debug:
+                    trace(f"Debugging: Trying char={char}")
                 if k <= half:
                     result += char
                     options = ['a', 'b', 'c']  # Reset options. Not strictly necessary, but keeps code cleaner.
-                    print(f"Debugging: Appended char={char}, result={result}, k={k}")
+                    if debug:
+                        trace(f"Debugging: Appended char={char}, result={result}, k={k}")
                     found_char = True
                     break
                 else:
                     k -= half
-                    print(f"Debugging: Skipping char={char}, k is now={k}")
+                    if debug:
+                        trace(f"Debugging: Skipping char={char}, k is now={k}")
 
             if not found_char:
-                print("Debugging: No valid character found in this iteration.  This should not happen.")
+                if debug:
+                    trace("Debugging: No valid character found in this iteration.  This should not happen.")
                 return ""  # indicates error. This *shouldn't* happen with the given logic.
 
-        print(f"Debugging: Final result={result}")
+        if debug:
+            trace(f"Debugging: Final result={result}")
         return result
 
 # Test Cases
 if __name__ == '__main__':
+    tracer.set_level(DEBUG)
     solution = Solution()
 
     # Test case 1
@@ -0,0 +1,229 @@
+'''
+Low overhead call profiler
+
+measure_execution_time in test.py used time.time() (coarse, can jump) and printed on every call.
+Here every call is timed with perf_counter_ns and only aggregated in memory :
+count, total, min, max and a log-linear histogram (HDR style buckets, 16 per power of two,
+about 6% precision) giving p50 / p90 / p99. report() prints the table, by default once at exit.
+
+    @measure_execution_time
+    def work(): ...
+
+    report()
+
+Overhead per call, measured by overhead_benchmark() (python profiling.py) on a small cloud VM
+with Python 3.11 : about 1.0 us, most of it the two perf_counter_ns calls, against about 2.0 us
+for the printing version even with its output going to a memory buffer (a real terminal is slower).
+'''
+
+import atexit
+import functools
+import io
+import sys
+import time
+from typing import Callable, Dict, List, Optional, TextIO
+
+SUB_BITS = 4  # 2**SUB_BITS buckets per power of two
+SMALL = 1 << (SUB_BITS + 1)  # values below this get one bucket each
+BUCKETS = (64 << SUB_BITS) + SMALL
+
+
+def bucket_of(value: int) -> int:
+    """Histogram bucket of a duration in ns"""
+    if value < SMALL:
+        return value
+    shift = value.bit_length() - SUB_BITS - 1
+    return (shift << SUB_BITS) + (value >> shift)
+
+
+def bucket_low(index: int) -> int:
+    """Smallest duration of a bucket"""
+    if index < SMALL:
+        return index
+    shift = (index >> SUB_BITS) - 1
+    return (index - (shift << SUB_BITS)) << shift
+
+
+COUNT, TOTAL, MIN, MAX = range(4)
+NO_MIN = 1 << 63
+
+
+class CallStats:
+    """Aggregated timings of one function"""
+    def __init__(self, name: str):
+        self.name = name
+        self.reset()
+
+    def reset(self):
+        # plain lists, updated in place by the wrapper without method calls
+        self.totals = [0, 0, NO_MIN, 0]  # count, total, min, max
+        self.histogram = [0] * BUCKETS
+
+    count = property(lambda self: self.totals[COUNT])
+    total = property(lambda self: self.totals[TOTAL])
+    min = property(lambda self: self.totals[MIN] if self.totals[COUNT] else 0)
+    max = property(lambda self: self.totals[MAX])
+
+    def record(self, elapsed: int):
+        totals = self.totals
+        totals[COUNT] += 1
+        totals[TOTAL] += elapsed
+        if elapsed < totals[MIN]:
+            totals[MIN] = elapsed
+        if elapsed > totals[MAX]:
+            totals[MAX] = elapsed
+        self.histogram[bucket_of(elapsed)] += 1
+
+    def percentile(self, p: float) -> int:
+        """Duration (ns, bucket lower bound) under which p percent of the calls fall"""
+        if not self.count:
+            return 0
+        target = self.count * p / 100
+        seen = 0
+        for index, n in enumerate(self.histogram):
+            seen += n
+            if n and seen >= target:
+                return min(max(bucket_low(index), self.min), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'total_ms': self.total / 1e6,
+            'mean_us': self.total / self.count / 1e3 if self.count else 0.0,
+            'min_us': self.min / 1e3,
+            'p50_us': self.percentile(50) / 1e3,
+            'p90_us': self.percentile(90) / 1e3,
+            'p99_us': self.percentile(99) / 1e3,
+            'max_us': self.max / 1e3,
+        }
+
+
+_stats: Dict[str, CallStats] = {}
+_report_registered = False
+
+
+def measure_execution_time(func: Optional[Callable] = None, *, name: Optional[str] = None, report_at_exit=True):
+    """
+    Decorator aggregating the execution time of every call.
+
+    Args:
+        func: decorated function (the decorator also works as @measure_execution_time(name=...)).
+        name: key in the report, module.qualname of func by default (two `wrapper` or `main`
+            functions of different modules get their own rows).
+        report_at_exit: print report() when the interpreter exits.
+    """
+    if func is None:
+        return functools.partial(measure_execution_time, name=name, report_at_exit=report_at_exit)
+
+    key = name or f"{func.__module__}.{func.__qualname__}"
+    stats = _stats.get(key)
+    if stats is None:
+        stats = _stats[key] = CallStats(key)
+    clock = time.perf_counter_ns
+
+    if report_at_exit:
+        global _report_registered
+        if not _report_registered:
+            atexit.register(report)
+            _report_registered = True
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = clock()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            # CallStats.record inlined, this runs on every call
+            elapsed = clock() - start
+            totals = stats.totals
+            totals[COUNT] += 1
+            totals[TOTAL] += elapsed
+            if elapsed < totals[MIN]:
+                totals[MIN] = elapsed
+            if elapsed > totals[MAX]:
+                totals[MAX] = elapsed
+            if elapsed < SMALL:
+                stats.histogram[elapsed] += 1
+            else:
+                shift = elapsed.bit_length() - SUB_BITS - 1
+                stats.histogram[(shift << SUB_BITS) + (elapsed >> shift)] += 1
+
+    wrapper.stats = stats
+    return wrapper
+
+
+def get_stats(name: str) -> CallStats:
+    return _stats[name]
+
+
+def reset():
+    for stats in _stats.values():
+        stats.reset()
+
+
+def report(file: Optional[TextIO] = None, sort='total_ms'):
+    """Print one line per profiled function, biggest `sort` column first"""
+    file = file or sys.stdout
+    rows: List[Dict[str, float]] = []
+    for name, stats in _stats.items():
+        if stats.count:
+            rows.append({'name': name, **stats.summary()})
+    if not rows:
+        return
+    rows.sort(key=lambda row: row[sort], reverse=True)
+    columns = ['count', 'total_ms', 'mean_us', 'min_us', 'p50_us', 'p90_us', 'p99_us', 'max_us']
+    width = max(len(row['name']) for row in rows)
+    print(f"{'function':<{width}} " + ' '.join(f"{c:>10}" for c in columns), file=file)
+    for row in rows:
+        values = ' '.join(f"{row[c]:>10}" if c == 'count' else f"{row[c]:>10.2f}" for c in columns)
+        print(f"{row['name']:<{width}} {values}", file=file)
+
+
+def old_measure_execution_time(func):
+    """The test.py version, for the overhead comparison"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start_time = time.time()
+        result = func(*args, **kwargs)
+        end_time = time.time()
+        execution_time = end_time - start_time
+        print(f"Execution time of {func.__name__}: {execution_time:.4f} seconds")
+        return result
+    return wrapper
+
+
+def overhead_benchmark(calls=10**6):
+    """ns added per call by each decorator, around an empty function"""
+    def noop(x):
+        return x
+
+    def per_call(fn) -> float:
+        start = time.perf_counter_ns()
+        for i in range(calls):
+            fn(i)
+        return (time.perf_counter_ns() - start) / calls
+
+    base = per_call(noop)
+    profiled = per_call(measure_execution_time(noop, name='overhead_benchmark.noop', report_at_exit=False))
+    sink = io.StringIO()
+    old = old_measure_execution_time(noop)
+    saved, sys.stdout = sys.stdout, sink
+    try:
+        printing = per_call(old)
+    finally:
+        sys.stdout = saved
+    print(f"plain call: {base:.0f} ns")
+    print(f"measure_execution_time: +{profiled - base:.0f} ns per call")
+    print(f"test.py version (output to a buffer): +{printing - base:.0f} ns per call")
+    _stats.pop('overhead_benchmark.noop')
+
+
+if __name__ == '__main__':
+    @measure_execution_time
+    def sleepy_function(duration):
+        time.sleep(duration)
+
+    for d in (0.001, 0.002, 0.005) * 20:
+        sleepy_function(d)
+    overhead_benchmark()
@@ -1,31 +1,17 @@
 import time
-import functools
 
-def measure_execution_time(func):
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        start_time = time.time()
-        result = func(*args, **kwargs)
-        end_time = time.time()
-        execution_time = end_time - start_time
-        print(f"Execution time of {func.__name__}: {execution_time:.4f} seconds")
-        return result
-    return wrapper
+# perf_counter_ns timings aggregated per function, the report is printed at exit
+from profiling import measure_execution_time
 
 @measure_execution_time
 def sleepy_function(duration):
     time.sleep(duration)
 
 sleepy_function(2)
-# Output: Execution time of sleepy_function: 2.0008 seconds
+# Output at exit: count, total, min, percentiles and max of sleepy_function
 
 
-def fib(n):
-    if n == 0:
-        return 0
-    elif n == 1:
-        return 1
-    else:
-        return fib(n-1) + fib(n-2) 
-    
+# fast doubling instead of the double recursion (kept as fibonacci.recursive_fib)
+from fibonacci import fib
+
 print(fib(40))
@@ -0,0 +1,103 @@
+'''
+Lightweight tracing for the algorithm solutions
+
+The solutions used to print inside their hot loops. They now emit through a named Tracer :
+
+    tracer = get_tracer('leetcode')
+    debug = tracer.enabled(DEBUG)       # checked once, before the loop
+    for ...:
+        if debug:
+            tracer.emit(f"...")         # the f-string is only built when tracing is on
+
+Tracers are OFF by default, so a silent call costs one bool test per step.
+TRACE_LEVEL=debug (or info) in the environment changes the default, set_level() changes one tracer.
+'''
+
+import os
+import sys
+from typing import Dict, Optional, TextIO
+
+OFF, INFO, DEBUG = 0, 1, 2
+LEVELS = {'off': OFF, 'info': INFO, 'debug': DEBUG}
+
+DEFAULT_LEVEL = LEVELS.get(os.environ.get('TRACE_LEVEL', 'off').lower(), OFF)
+
+
+class Tracer:
+    """Named trace output with a verbosity level"""
+    def __init__(self, name: str, level: int = DEFAULT_LEVEL, stream: Optional[TextIO] = None):
+        self.name = name
+        self.level = level
+        self.stream = stream  # None -> sys.stdout at write time (works with redirect_stdout)
+
+    def set_level(self, level: int):
+        self.level = level
+
+    def enabled(self, level: int = DEBUG) -> bool:
+        return self.level >= level
+
+    def emit(self, message: str):
+        """Write a message, no level check (callers check enabled() once)"""
+        (self.stream or sys.stdout).write(message + '\n')
+
+    def debug(self, fmt: str, *args):
+        """Level checked, message formatted with str.format only when written"""
+        if self.level >= DEBUG:
+            self.emit(fmt.format(*args) if args else fmt)
+
+    def info(self, fmt: str, *args):
+        if self.level >= INFO:
+            self.emit(fmt.format(*args) if args else fmt)
+
+
+_tracers: Dict[str, Tracer] = {}
+
+
+def get_tracer(name: str) -> Tracer:
+    """Tracer of a name, created once"""
+    tracer = _tracers.get(name)
+    if tracer is None:
+        tracer = _tracers[name] = Tracer(name)
+    return tracer
+
+
+def set_level(level: int, name: Optional[str] = None):
+    """Level of one tracer, or of every tracer when name is None"""
+    for tracer in ([get_tracer(name)] if name else _tracers.values()):
+        tracer.set_level(level)
+
+
+def benchmark():
+    """Silent mode against tracing on (the old behaviour), trace output sent to a null stream"""
+    import io
+    import time
+
+    import leetcode
+    # appended, so the root leetcode.py is not shadowed by day10/leetcode.py
+    root = os.path.dirname(os.path.abspath(__file__))
+    sys.path.append(os.path.join(root, 'day9(19-02-2025)'))
+    sys.path.append(os.path.join(root, 'day10(20-02-2025)'))
+    import anargam
+    import lc238
+
+    # module tracers : when this file runs as __main__ its registry is not the one they use
+    cases = [
+        (leetcode.tracer, 'getHappyString(10, 100) x200', lambda: [leetcode.Solution().getHappyString(10, 100) for _ in range(200)]),
+        (lc238.tracer, 'productExceptSelf(n=300)', lambda: lc238.Solution().productExceptSelf(list(range(1, 301)))),
+        (anargam.tracer, 'groupAnagrams(300 words)', lambda: anargam.groupAnagrams(["eat", "tea", "tan", "ate", "nat", "bat"] * 50)),
+    ]
+    for tracer, label, run in cases:
+        timings = {}
+        for level in (DEBUG, OFF):
+            tracer.set_level(level)
+            tracer.stream = io.StringIO()
+            start = time.perf_counter()
+            run()
+            timings[level] = time.perf_counter() - start
+        tracer.stream = None
+        print(f"{label}: traced {timings[DEBUG] * 1e3:.2f} ms, silent {timings[OFF] * 1e3:.2f} ms, "
+              f"{timings[DEBUG] / timings[OFF]:.0f}x")
+
+
+if __name__ == '__main__':
+    benchmark()